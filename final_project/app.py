@@ -1,11 +1,25 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import pkg_resources
 from datetime import datetime, timedelta
+import logging
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from packaging import version
 import pyodbc
+import pyarrow as pa
+
+# Optional: turbodbc streams result sets as Arrow columns instead of Python rows
+try:
+    import turbodbc
+except ImportError:
+    turbodbc = None
+
+logger = logging.getLogger(__name__)
 
 # --- Custom CSS ---
 st.markdown("""
@@ -33,6 +47,14 @@ st.markdown("""
         padding-top: 5px !important;
         padding-bottom: 5px !important;
     }
+    /* Holder / insider tables: bold headers and hover highlight */
+    th { font-size: 16px; font-weight: bold; text-align: left; }
+    td { font-size: 14px; }
+    tbody tr:hover { background-color: #f0f8ff; }
+    /* 20px between the stacked Health History charts */
+    .st-key-health-history > div:not(:last-child) {
+        margin-bottom: 20px;
+    }
     </style>
 """, unsafe_allow_html=True)
 
@@ -48,18 +70,285 @@ st.set_page_config(page_title="Stock Dashboard", page_icon="📈", layout="wide"
 # ---------------------------------------------------------
 # SQL CONNECTION + LOADING TABLES
 # ---------------------------------------------------------
-@st.cache_data(ttl=600)
-def load_sql_data():
-    conn_str = (
-        "DRIVER={ODBC Driver 18 for SQL Server};"
-        "SERVER=localhost;"
-        "DATABASE=stock_project;"
-        "Trusted_Connection=yes;"
-        "TrustServerCertificate=yes;"
-    )
+# Columns the dashboard actually reads from each table
+# (tables not listed here, e.g. simply_wallstreet_facts, are read in full)
+TABLE_COLUMNS = {
+    "company_info": [
+        "ticker", "holding_date", "owner_name", "owner_type",
+        "shares_held", "percent_shares_outstanding", "percent_of_portfolio",
+    ],
+    "fear_and_greed_index": ["date", "fear_and_greed"],
+    "google_news": [
+        "query_text", "title_text", "link_url", "published_at", "source_name",
+        "sentiment_label", "sentiment_positive", "sentiment_neutral", "sentiment_negative",
+    ],
+    "insider_transactions": [
+        "ticker", "filing_date", "owner_name", "owner_type",
+        "transaction_type", "shares", "price_max", "transaction_value",
+    ],
+    "ownership_breakdown": [
+        "ticker", "html_creation_date",
+        "institutions_shares", "institutions_percent",
+        "public_companies_shares", "public_companies_percent",
+        "private_companies_shares", "private_companies_percent",
+        "individual_insiders_shares", "individual_insiders_percent",
+        "vcpe_firms_shares", "vcpe_firms_percent",
+        "general_public_shares", "general_public_percent",
+    ],
+    "snowflake_scores": ["tickers", "date", "value", "future", "past", "health", "dividend"],
+    "stock_data": [
+        "tickers", "trade_date", "open_price", "high_price", "low_price", "close_price",
+        "volume", "dividend", "split",
+        "rsi_5", "rsi_14", "rsi_30", "rsi_50",
+        "sma_10", "sma_50", "sma_200",
+        "std_dev_10", "std_dev_20", "std_dev_100",
+    ],
+    "tickers": [
+        "tickers", "names", "financial_instrument",
+        "sector", "industry", "country", "descriptions",
+    ],
+}
+
+# String id columns with few distinct values, stored as category
+CATEGORY_COLUMNS = [
+    "tickers", "ticker", "source_file", "query_text", "sector", "industry", "country", "financial_instrument",
+    "owner_type", "transaction_type",
+]
+
+# Tables where only the most recent row per ticker is used: (partition key, date column)
+LATEST_ROW_TABLES = {
+    "simply_wallstreet_facts": ("source_file", "date"),
+    "ownership_breakdown": ("ticker", "html_creation_date"),
+    "snowflake_scores": ("tickers", "date"),
+}
+
+
+def build_table_query(table):
+    """SELECT for one table; latest-row tables are filtered server-side."""
+    cols = TABLE_COLUMNS.get(table)
+    select_list = ", ".join(f"[{c}]" for c in cols) if cols else "*"
+
+    if table in LATEST_ROW_TABLES:
+        key, date_col = LATEST_ROW_TABLES[table]
+        return (
+            f"SELECT {select_list} FROM ("
+            f"SELECT {select_list}, ROW_NUMBER() OVER (PARTITION BY [{key}] ORDER BY [{date_col}] DESC) AS rn "
+            f"FROM dbo.{table}"
+            ") t WHERE rn = 1"
+        )
+    return f"SELECT {select_list} FROM dbo.{table}"
+
+
+SQL_CONN_STR = (
+    "DRIVER={ODBC Driver 18 for SQL Server};"
+    "SERVER=localhost;"
+    "DATABASE=stock_project;"
+    "Trusted_Connection=yes;"
+    "TrustServerCertificate=yes;"
+)
+
+
+def downcast_frame(df):
+    """Shrink read_sql's float64/int64 defaults and category-encode string id columns.
+
+    pd.to_numeric only downcasts when the values survive the narrower type,
+    so large amounts (market caps, share counts) keep full precision.
+    """
+    float_cols = df.select_dtypes("float").columns
+    if len(float_cols):
+        df[float_cols] = df[float_cols].apply(pd.to_numeric, downcast="float")
+
+    int_cols = df.select_dtypes("integer").columns
+    if len(int_cols):
+        df[int_cols] = df[int_cols].apply(pd.to_numeric, downcast="integer")
+
+    for col in CATEGORY_COLUMNS:
+        if col in df and df[col].dtype == object:
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+# Key/name columns with stray whitespace in SQL, stripped once at load
+STRIP_COLUMNS = {
+    "company_info": ["ticker"],
+    "insider_transactions": ["ticker"],
+    "tickers": ["tickers", "names"],
+    "simply_wallstreet_facts": ["source_file"],
+    "snowflake_scores": ["tickers"],
+    "ownership_breakdown": ["ticker"],
+}
+
+# Timestamp columns parsed once at load
+DATE_COLUMNS = {
+    "company_info": ["holding_date"],
+    "fear_and_greed_index": ["date"],
+    "google_news": ["published_at"],
+    "insider_transactions": ["filing_date"],
+    "simply_wallstreet_facts": ["date"],
+    "ownership_breakdown": ["html_creation_date"],
+}
+
+# Upper-cased "ticker" key for the snapshot builders, derived from these columns
+UPPER_TICKER_COLUMNS = {
+    "company_info": "ticker",
+    "insider_transactions": "ticker",
+    "simply_wallstreet_facts": "source_file",
+    "ownership_breakdown": "ticker",
+}
+
+# Per-ticker tables indexed by ticker so reruns use hash lookups instead of masks
+TICKER_INDEX_COLUMNS = {
+    "company_info": "ticker",
+    "insider_transactions": "ticker",
+    "simply_wallstreet_facts": "source_file",
+    "snowflake_scores": "tickers",
+    "tickers": "tickers",
+}
+
+
+def index_by_ticker(df, col):
+    """Index df by its ticker column, keeping the column itself."""
+    if col not in df:
+        return df
+    # Unnamed index so groupby/sort on the column stays unambiguous
+    return df.set_index(col, drop=False).rename_axis(None)
+
+
+def ticker_rows(df, ticker):
+    """All rows of a ticker-indexed frame for one ticker (empty frame if none)."""
+    return df.loc[[ticker]] if ticker in df.index else df.iloc[0:0]
+
+
+# ---------------- on-disk parquet cache ----------------
+# Versioned so a change to load_table's output doesn't read stale parquet files
+SQL_CACHE_DIR = os.path.join(".cache", "sql", "v10")
+
+# Upper bound on a cache file's age, even when its signature still matches
+CACHE_MAX_AGE = timedelta(days=1)
+
+
+def table_signature(conn, table):
+    """Row count plus aggregate row checksum; changes on INSERT, UPDATE and DELETE.
+
+    Business dates (holding_date, filing_date, ...) can't tell back-filled,
+    same-day, updated or deleted rows apart, so the rows themselves are checksummed.
+    Returns None when the server can't compute it, which marks the cache stale.
+    """
+    try:
+        count, checksum = conn.cursor().execute(
+            f"SELECT COUNT_BIG(*), CHECKSUM_AGG(BINARY_CHECKSUM(*)) FROM dbo.{table}"
+        ).fetchone()
+    except pyodbc.Error as e:
+        logger.warning("Could not compute cache signature for %s: %s", table, e)
+        return None
+    return f"{count}:{checksum}"
+
+
+def cached_table_is_fresh(path, signature):
+    """True when the parquet copy is younger than CACHE_MAX_AGE and was written for this signature."""
+    sig_path = path + ".sig"
+    if signature is None or not (os.path.exists(path) and os.path.exists(sig_path)):
+        return False
+
+    cached_at = datetime.fromtimestamp(os.path.getmtime(path))
+    if datetime.now() - cached_at >= CACHE_MAX_AGE:
+        return False
+
+    with open(sig_path) as f:
+        return f.read() == signature
+
+
+def read_frame(query, params=None, parse_dates=None):
+    """Run a SELECT on its own connection, via Arrow when turbodbc is installed."""
+    if turbodbc is None:
+        conn = pyodbc.connect(SQL_CONN_STR)
+        try:
+            return pd.read_sql(query, conn, params=params, parse_dates=parse_dates)
+        finally:
+            conn.close()
+
+    conn = turbodbc.connect(connection_string=SQL_CONN_STR)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params or [])
+        df = cursor.fetchallarrow().to_pandas()
+    finally:
+        conn.close()
+
+    # Arrow DATE columns arrive as python dates
+    for col in parse_dates or []:
+        df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def load_table(table):
+    """Fetch one table on its own connections (pyodbc connections are not thread-safe)."""
+    cache_path = os.path.join(SQL_CACHE_DIR, f"{table}.parquet")
+    conn = pyodbc.connect(SQL_CONN_STR, autocommit=True)
+    try:
+        signature = table_signature(conn, table)
+    finally:
+        conn.close()
+
+    if cached_table_is_fresh(cache_path, signature):
+        cached = pd.read_parquet(cache_path)
+        # Files written before dates were parsed at load time hold them as strings
+        if all(pd.api.types.is_datetime64_any_dtype(cached[col]) for col in DATE_COLUMNS.get(table, [])):
+            return cached
+
+    df = read_frame(build_table_query(table))
+
+    # Drop the ROW_NUMBER helper column from latest-row queries
+    df = df.drop(columns="rn", errors="ignore")
+
+    for col in STRIP_COLUMNS.get(table, []):
+        if col in df:
+            df[col] = df[col].str.strip()
+
+    if table in UPPER_TICKER_COLUMNS and UPPER_TICKER_COLUMNS[table] in df:
+        df["ticker"] = df[UPPER_TICKER_COLUMNS[table]].str.upper()
+
+    # Card color for each article's sentiment, so the news section does no string work
+    if table == "google_news" and "sentiment_label" in df:
+        label = df["sentiment_label"].astype(str).str.lower()
+        df["sentiment_color"] = np.where(
+            label.eq("positive"), "green", np.where(label.eq("negative"), "red", "black")
+        )
+
+    for col in DATE_COLUMNS.get(table, []):
+        # DATE/DATETIME columns already arrive typed; only text columns need parsing,
+        # and their format is inferred like the per-section parses this replaced
+        if col in df and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+
+    df = downcast_frame(df)
+
+    if table in TICKER_INDEX_COLUMNS:
+        df = index_by_ticker(df, TICKER_INDEX_COLUMNS[table])
+
+    # Best-effort: a failed cache write only means the next load hits SQL.
+    # The old signature goes first and the new one last, so a half-written
+    # parquet file is never trusted.
+    sig_path = cache_path + ".sig"
+    try:
+        if os.path.exists(sig_path):
+            os.remove(sig_path)
+        df.to_parquet(cache_path, compression="zstd")
+        if signature is not None:
+            with open(sig_path, "w") as f:
+                f.write(signature)
+    except (OSError, pa.ArrowException) as e:
+        logger.warning("Could not write parquet cache for %s: %s", table, e)
+
+    return df
 
+
+# cache_resource: every session shares these frames read-only, with no per-run copy
+@st.cache_resource(ttl=600)
+def load_sql_data():
     try:
-        conn = pyodbc.connect(conn_str)
+        pyodbc.connect(SQL_CONN_STR).close()
     except pyodbc.Error as e:
         st.error(f"❌ Could not connect to SQL Server: {e}")
         return None
@@ -72,106 +361,532 @@ def load_sql_data():
         "ownership_breakdown": None,
         "simply_wallstreet_facts": None,
         "snowflake_scores": None,
-        "stock_data": None,
         "tickers": None,
     }
 
-    for table in tables:
-        try:
-            if table == "stock_data":
-                df = pd.read_sql(
-                    f"SELECT * FROM dbo.{table}",
-                    conn,
-                    parse_dates=["date"]
-                )
-            else:
-                df = pd.read_sql(f"SELECT * FROM dbo.{table}", conn)
+    os.makedirs(SQL_CACHE_DIR, exist_ok=True)
 
-            tables[table] = df
+    # pyodbc releases the GIL while the server works, so the reads overlap
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = {table: pool.submit(load_table, table) for table in tables}
 
+    # Report failures from the script thread; st.* calls need its context
+    for table, future in futures.items():
+        try:
+            tables[table] = future.result()
         except Exception as e:
             st.warning(f"⚠️ Could not load table {table}: {e}")
             tables[table] = pd.DataFrame()
 
+    # Derived lookups live in the shared resource, built once per load rather than per rerun
+    tables["latest_lookups"] = build_latest_lookups(
+        tables["simply_wallstreet_facts"], tables["snowflake_scores"], tables["ownership_breakdown"]
+    )
+    tables["news_by_company"] = news_by_company(tables["google_news"])
+
     return tables
 
 
-# Load data
-sql = load_sql_data()
-if sql is None:
-    st.stop()
+def build_latest_lookups(sw_facts_df, snowflake_df, ownership_df):
+    """Ticker -> latest row dicts so reruns use O(1) lookups instead of masks."""
+    sw_by_ticker = {}
+    if "source_file" in sw_facts_df:
+        sw_by_ticker = {
+            t: g.iloc[0]
+            for t, g in sw_facts_df.groupby("source_file", sort=False, observed=True)
+        }
 
-# ---------------- sw_facts_df ----------------
-# Keep all rows with the most recent "date" per "source_file"
-df = sql["simply_wallstreet_facts"].copy()
-if not df.empty and "source_file" in df and "date" in df:
-    sw_facts_df = df.loc[
-        df.groupby("source_file")["date"].transform("max") == df["date"]
-    ]
-else:
-    sw_facts_df = df
+    snowflake_by_ticker = {}
+    if "tickers" in snowflake_df:
+        snowflake_by_ticker = {
+            t: g.iloc[0]
+            for t, g in snowflake_df.groupby("tickers", sort=False, observed=True)
+        }
+
+    ownership_by_ticker = {}
+    if "ticker" in ownership_df:
+        ownership_by_ticker = {
+            t: g.iloc[0]
+            for t, g in ownership_df.groupby("ticker", sort=False, observed=True)
+        }
+
+    return sw_by_ticker, snowflake_by_ticker, ownership_by_ticker
+
+
+@st.cache_data(ttl=600)
+def ticker_lookups(tickers_df):
+    """Sorted "TICKER - Name" dropdown options and a ticker -> name dict."""
+    tickers = tickers_df["tickers"].astype(str)
+    names = tickers_df["names"].astype(str)
+
+    options = (tickers + " - " + names).sort_values().tolist()
+    return options, dict(zip(tickers, names))
 
-# ---------------- ownership_breakdown ----------------
-df = sql["ownership_breakdown"].copy()
 
-ownership_df = pd.DataFrame()
+def news_by_company(news_df):
+    """Company name -> its news articles, grouped once instead of masked per rerun."""
+    if "query_text" not in news_df:
+        return {}
+    return {k: g for k, g in news_df.groupby("query_text", sort=False, observed=True)}
 
-if isinstance(df, pd.DataFrame) and not df.empty:
-    if "ticker" in df.columns and "html_creation_date" in df.columns:
-        ownership_df = (
-            df.loc[df.groupby("ticker")["html_creation_date"]
-                     .transform("max") == df["html_creation_date"]]
-            .reset_index(drop=True)
+
+@st.cache_data(ttl=600)
+def sentiment_30d(company):
+    """Average sentiment and article count for one company over the last 30 days, or None."""
+    # Keyed on the name so reruns hash a string, not the news frame
+    sql = load_sql_data()
+    articles = sql["news_by_company"].get(company) if sql is not None else None
+    if articles is None:
+        return None
+
+    cutoff_date = pd.Timestamp.now() - pd.Timedelta(days=30)
+    recent = articles[articles["published_at"] >= cutoff_date]
+    if recent.empty:
+        return None
+
+    return (
+        recent["sentiment_positive"].mean(),
+        recent["sentiment_neutral"].mean(),
+        recent["sentiment_negative"].mean(),
+        len(recent),
+    )
+
+
+def normalize_ticker(series):
+    # String work once per distinct ticker, then broadcast back with a lookup
+    s = series.astype(str)
+    uniq = s.unique()
+    return s.map(dict(zip(uniq, pd.Index(uniq).str.upper().str.strip())))
+
+
+@st.cache_data(ttl=600)
+def load_stock_for_ticker(ticker):
+    """Price history for a single ticker, oldest first.
+
+    Backed by an index on (tickers, trade_date):
+    CREATE INDEX IX_stock_data_tickers_date ON dbo.stock_data (tickers, trade_date)
+    """
+    cols = TABLE_COLUMNS["stock_data"]
+    select_list = ", ".join(f"[{c}]" for c in cols)
+
+    try:
+        df = read_frame(
+            f"SELECT {select_list} FROM dbo.stock_data WHERE tickers = ? ORDER BY trade_date",
+            params=[ticker],
+            parse_dates=["trade_date"]
         )
+    except Exception as e:
+        st.warning(f"⚠️ Could not load stock data for {ticker}: {e}")
+        return pd.DataFrame(columns=cols)
+
+    # Technical indicators are only displayed to 2 decimals
+    indicator_cols = [c for c in df.columns if c.startswith(("rsi_", "sma_", "std_dev_"))]
+    df[indicator_cols] = df[indicator_cols].astype("float32")
+
+    # Upper-case key matching the shared tables' "ticker" column
+    df["ticker"] = normalize_ticker(df["tickers"])
+
+    # Sorted DatetimeIndex so date ranges slice by binary search; column kept for callers
+    return downcast_frame(df).set_index("trade_date", drop=False).rename_axis(None)
+
+
+@st.cache_data(ttl=600)
+def price_change_summary(ticker):
+    """Latest close plus its 7D and 1Y % change, computed once per ticker."""
+    closes = load_stock_for_ticker(ticker)["close_price"].to_numpy()
+    if not len(closes):
+        return 0, 0, 0
+
+    recent_close = float(closes[-1])
+    past_week = float(closes[-5]) if len(closes) >= 5 else recent_close
+    past_year = float(closes[-252]) if len(closes) >= 252 else recent_close
+
+    change_7d = ((recent_close - past_week) / past_week * 100) if past_week else 0
+    change_1y = ((recent_close - past_year) / past_year * 100) if past_year else 0
+
+    return recent_close, change_7d, change_1y
+
+
+def to_float(x, default=0.0):
+    """Scalar float cast; missing, NaN or non-numeric values give default."""
+    # Type checks instead of try/except; numeric strings are parsed with coercion
+    if pd.api.types.is_number(x):
+        v = float(x)
+    elif isinstance(x, str):
+        v = float(pd.to_numeric(x.strip(), errors="coerce"))
     else:
-        ownership_df = df.reset_index(drop=True)
+        return default
+    return default if v != v else v
+
+
+# ---------------- cached figures ----------------
+# Built once per distinct input and shared across reruns/sessions
+SNOWFLAKE_AXES = ["value", "future", "past", "health", "dividend"]
+
+
+@st.cache_resource(max_entries=256)
+def build_snowflake_chart(values, label):
+    """Radar chart of the five snowflake scores; cached per (scores, ticker)."""
+    axes = SNOWFLAKE_AXES
+    labels = [a.title() for a in axes]
+    values = list(values)
 
-# ---------------- snowflake_df ----------------
-df = sql["snowflake_scores"].copy()
-if not df.empty and "tickers" in df and "date" in df:
-    snowflake_df = df.loc[
-        df.groupby("tickers")["date"].transform("max") == df["date"]
+    # Close the radar polygon
+    r = values + [values[0]]
+    theta = labels + [labels[0]]
+
+    hover_descriptions = {
+        "value": "Is the company undervalued compared to peers and cashflows?",
+        "future": "Forecasted performance in 1–3 years?",
+        "past": "Performance over the last 5 years?",
+        "health": "Financial health and debt levels?",
+        "dividend": "Dividend quality and reliability?"
+    }
+
+    hover_text = [
+        f"<span style='font-size:13px'><b>{lbl}</b>: {val}/6<br>{hover_descriptions[key]}</span>"
+        for key, lbl, val in zip(axes, labels, values)
     ]
-else:
-    snowflake_df = df
+    hover_text.append(hover_text[0])
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=r,
+        theta=theta,
+        fill='toself',
+        line=dict(color="#00ccff", width=4),
+        marker=dict(size=6, color="#00ccff"),
+        hoverinfo="text",
+        hovertext=hover_text
+    ))
+
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0,6],
+                tickvals=[1,2,3,4,5,6],
+                ticktext=[
+                    "<span style='color:white'>1</span>",
+                    "<span style='color:white'>2</span>",
+                    "<span style='color:white'>3</span>",
+                    "<span style='color:white'>4</span>",
+                    "<span style='color:white'>5</span>",
+                    "<span style='color:white; font-weight:bold; text-shadow:-1px -1px 0 #000, 1px -1px 0 #000, -1px 1px 0 #000, 1px 1px 0 #000'>6</span>"
+                ],
+
+                tickfont=dict(size=12),
+            ),
+            angularaxis=dict(
+                tickvals=labels,
+                ticktext=labels,
+                tickfont=dict(size=14, color="black"),
+                direction="clockwise",
+                rotation=90
+            )
+        ),
+        template="plotly_dark",
+        showlegend=False,
+        margin=dict(t=30, b=20, l=55, r=35),
+        width=390,
+        height=351
+    )
+
+    return fig
+
+
+@st.cache_resource(max_entries=256)
+def build_price_target_chart(target_low, target_avg, target_high, recent_close, currency_symbol):
+    """Analyst low/avg/high targets vs. current price on one line; cached per inputs."""
+    price_points = {
+        "Lowest Estimate": target_low,
+        "Average Estimate": target_avg,
+        "Highest Estimate": target_high,
+        "Current Price": recent_close
+    }
+
+    sorted_points = sorted(price_points.items(), key=lambda x: x[1])
+
+    fig = go.Figure()
+
+    # Line connecting points
+    fig.add_trace(go.Scatter(
+        x=[p[1] for p in sorted_points],
+        y=[1] * len(sorted_points),
+        mode="lines",
+        line=dict(color="black", width=5),
+        hoverinfo="skip",
+        showlegend=False
+    ))
+
+    # Markers for each point
+    for label, value in sorted_points:
+        is_current = label == "Current Price"
+
+        fig.add_trace(go.Scatter(
+            x=[value],
+            y=[1],
+            mode="markers+text",
+            marker=dict(
+                size=14 if is_current else 11,
+                color="#00ccff" if is_current else "black"
+            ),
+            text=[f"<b>{currency_symbol}{value:.2f}</b>" if is_current else f"{currency_symbol}{value:.2f}"],
+            textposition="top center" if is_current else "bottom center",
+            textfont=dict(size=22),
+            hovertext=label,
+            hoverinfo="text",
+            hoverlabel=dict(font=dict(size=20)),
+            showlegend=False
+        ))
+
+    fig.update_layout(
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        margin=dict(t=10, b=10, l=20, r=20),
+        height=160
+    )
+
+    return fig
+
+
+# Shared chart palette
+ICE_BLUE = "#7FDBFF"
+DARK_ICE_BLUE = "#3399CC"
+GRAY = "#888888"
+BLACK = "#000000"
+
+# Company / industry / all-companies bar colors for the comparison charts
+COMPARE_BAR_COLORS = (ICE_BLUE, GRAY, BLACK)
+
+# White background and black text shared by every Extended Analysis bar chart
+BASE_FIG_LAYOUT = dict(plot_bgcolor="white", paper_bgcolor="white", font_color="black")
+
+# Comparison chart layout in plain-dict form (create_bar_chart skips go.* objects)
+COMPARE_LAYOUT = {
+    "xaxis": {"showgrid": False},
+    "yaxis": {"showgrid": False},
+    "plot_bgcolor": "white",
+    "paper_bgcolor": "white",
+    "font": {"color": "black"},
+    "showlegend": False,
+    "height": 350,
+}
+
+
+@st.cache_data(max_entries=512)
+def create_bar_chart(company_val, industry_val, all_val, title,
+                     company_label, industry_label, all_label, legend=None):
+    """Company vs. industry vs. all-companies bars as a plain figure dict (no go.* objects)."""
+    bars = zip(
+        (company_label, industry_label, all_label),
+        ("Company", "Industry", "All Companies"),
+        (company_val, industry_val, all_val),
+        COMPARE_BAR_COLORS,
+    )
+
+    fig = {
+        "data": [
+            {
+                "type": "bar", "name": name, "x": [x], "y": [val],
+                "marker": {"color": color}, "hoverinfo": "skip",
+                "text": [f"<b>{val}</b>"], "textposition": "auto", "textfont": {"size": 14},
+            }
+            for name, x, val, color in bars
+        ],
+        "layout": {
+            **COMPARE_LAYOUT,
+            "title": {"text": title, "x": 0.5, "xanchor": "center", "font": {"size": 22, "color": "black"}},
+            "margin": {"l": 20, "r": 20, "t": 60, "b": 20},
+        },
+    }
+
+    # Optional color-key legend drawn inside the figure, below the plot area
+    if legend:
+        fig["layout"]["annotations"] = [{
+            "x": 0.5, "y": -0.15, "xref": "paper", "yref": "paper", "showarrow": False,
+            "font": {"size": 12},
+            "text": " &nbsp;&nbsp; ".join(
+                f"<span style='color:{color}'><b>■</b></span> {label}"
+                for color, label in zip(COMPARE_BAR_COLORS, legend)
+            ),
+        }]
+        fig["layout"]["margin"]["b"] = 50
+
+    return fig
+
+
+# Layout shared by the Health History graphs; only the title differs
+HISTORY_LAYOUT = dict(
+    BASE_FIG_LAYOUT,
+    xaxis=dict(title="Year"),
+    yaxis=dict(title="Value"),
+    height=400,
+    margin=dict(l=40, r=40, t=80, b=40)
+)
+
+
+@st.cache_resource(max_entries=256)
+def build_history_bar_chart(values, title):
+    """One bar per history year; cached per (values, title)."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=[f"Year {i}" for i in range(len(values))],
+        y=list(values),
+        marker_color=COMPARE_BAR_COLORS[0],
+        texttemplate="%{y:,.1f}",
+        textposition="auto",
+        textfont=dict(size=16, color="black")
+    ))
+    fig.update_layout(
+        title=dict(text=title, x=0.5, xanchor="center", font=dict(size=22)),
+        **HISTORY_LAYOUT
+    )
+    return fig
+
+
+@st.cache_resource(max_entries=256)
+def build_past_history_grid(values, text_labels, labels, titles):
+    """All Past History series stacked in one figure, one subplot each; cached per inputs."""
+    fig = make_subplots(rows=len(titles), cols=1, subplot_titles=titles, vertical_spacing=0.4 / len(titles))
+
+    for row, (row_values, row_text, row_labels) in enumerate(zip(values, text_labels, labels), start=1):
+        fig.add_trace(go.Bar(
+            x=list(row_labels),
+            y=list(row_values),
+            marker_color=COMPARE_BAR_COLORS[0],
+            marker_line=dict(width=1, color="rgba(0,0,0,0.1)"),
+            text=list(row_text),
+            textposition="auto",
+            textfont=dict(size=14, family="Arial", color="black"),
+            hoverinfo="skip",
+            width=0.5
+        ), row=row, col=1)
+
+    fig.update_xaxes(tickfont=dict(size=12, color="black"))
+    fig.update_yaxes(tickfont=dict(size=12, color="black"))
+    fig.update_annotations(font=dict(size=20, color="black"))
+    fig.update_layout(
+        **BASE_FIG_LAYOUT,
+        showlegend=False,
+        margin=dict(l=40, r=40, t=70, b=40),
+        height=420 * len(titles),
+        bargap=0.35,
+        bargroupgap=0.15
+    )
+    return fig
+
+
+@st.cache_resource(max_entries=256)
+def build_dividend_bar_chart(title, categories, values, colors):
+    """One bar per category in its own color, white text on black bars; cached per inputs."""
+    fig = go.Figure()
+    for cat, val, colr in zip(categories, values, colors):
+        fig.add_trace(go.Bar(
+            x=[cat],
+            y=[val],
+            marker_color=colr,
+            width=0.45,
+            hoverinfo="skip",
+            text=[f"{val:,.3f}" if pd.notna(val) else "N/A"],
+            textposition="auto",
+            textfont=dict(size=14, color="white" if colr.lower() == "#000000" else "black")
+        ))
+    fig.update_layout(
+        title=dict(text=title, x=0.5, xanchor="center", font=dict(size=22, color="black")),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False),
+        **BASE_FIG_LAYOUT,
+        showlegend=False,
+        height=350,
+        margin=dict(l=20, r=20, t=60, b=20)
+    )
+    return fig
+
+
+FORECAST_HORIZONS = ["1 Year", "2 Year", "3 Year"]
+
+
+@st.cache_resource(max_entries=256)
+def build_forecast_grid_chart(values, titles):
+    """All 1/2/3-year forecast series stacked in one figure, one subplot each; cached per inputs."""
+    fig = make_subplots(rows=len(titles), cols=1, subplot_titles=titles, vertical_spacing=0.4 / len(titles))
+
+    for row, row_values in enumerate(values, start=1):
+        fig.add_trace(go.Bar(
+            x=FORECAST_HORIZONS,
+            y=list(row_values),
+            marker_color=COMPARE_BAR_COLORS[0],
+            texttemplate="%{y:,.1f}",
+            textposition="auto",
+            textfont=dict(size=16, color="black"),
+            width=0.4  # reduces bar width for more spacing
+        ), row=row, col=1)
+
+    # Axis titles repeat on every subplot; layout is shared once for the whole grid
+    fig.update_xaxes(title_text="Forecast Horizon")
+    fig.update_yaxes(title_text="Value")
+    fig.update_annotations(font_size=22)
+    fig.update_layout(
+        **BASE_FIG_LAYOUT,
+        bargap=0.6,  # adds spacing between groups
+        showlegend=False,
+        height=420 * len(titles),
+        margin=dict(l=40, r=40, t=60, b=40),
+    )
+
+    return fig
+
+
+# Load data
+sql = load_sql_data()
+if sql is None:
+    st.stop()
+
+# ---------------- latest-row tables ----------------
+# Already reduced to the most recent row per ticker by the SQL query
+sw_facts_df  = sql["simply_wallstreet_facts"]
+ownership_df = sql["ownership_breakdown"]
+snowflake_df = sql["snowflake_scores"]
+
+sw_by_ticker, snowflake_by_ticker, ownership_by_ticker = sql["latest_lookups"]
+
+# Text columns of the facts table, so value formatting can dispatch on dtype
+SW_STR_COLS = frozenset(sw_facts_df.select_dtypes(include=["object", "category"]).columns)
 
 # ---------------------------------------------------------
 # OTHER TABLES (NO SPECIAL FILTERING)
 # ---------------------------------------------------------
 
 tickers_df    = sql["tickers"]
-stock_df      = sql["stock_data"]
 news_df       = sql["google_news"]
 fear_greed_df = sql["fear_and_greed_index"]
 
-# --- Match name with tickers column
-ticker_to_name = dict(
-    zip(tickers_df["tickers"].str.strip(), tickers_df["names"].str.strip())
-)
+# --- Dropdown options + ticker -> name map (cached, rebuilt only when tickers_df changes)
+ticker_options, ticker_to_name = ticker_lookups(tickers_df)
 
 # --- Sidebar: Ticker Selection ---
 with st.sidebar:
     # Dropdown with ticker symbols and optional company names
-    ticker_options = tickers_df.apply(
-        lambda row: f"{row['tickers']} - {row['names']}", axis=1
-    )
-    selected_option = st.selectbox("Select a ticker:", sorted(ticker_options))
+    selected_option = st.selectbox("Select a ticker:", ticker_options)
 
 # Extract the ticker symbol safely
 selected_ticker = selected_option.split(" - ")[0].strip()
 
-# --- Match name with tickers column
-ticker_to_name = dict(
-    zip(tickers_df["tickers"].str.strip(), tickers_df["names"].str.strip())
-)
+# Upper-case form matching the normalized "ticker" key of the shared tables
+ticker_key = selected_ticker.upper()
 
 selected_company_name = ticker_to_name.get(selected_ticker)
 
 # Get the single row for the selected ticker
-info_row = tickers_df.loc[tickers_df["tickers"].str.strip() == selected_ticker]
+info_row = (
+    tickers_df.loc[[selected_ticker]]
+    if selected_ticker in tickers_df.index
+    else tickers_df.iloc[0:0]
+)
 
 if not info_row.empty:
-    info = info_row.iloc[0]  # just get the first (and only) row
+    info = info_row.iloc[0].to_dict()  # just get the first (and only) row
 else:
     info = {"descriptions": "No description available", 
             "country": "N/A", 
@@ -180,8 +895,8 @@ else:
 instrument_type = info.get("financial_instrument", "").upper()
 
 # Filter stock data for the selected ticker
-price_data = stock_df[stock_df["tickers"] == selected_ticker].sort_values("trade_date")
-latest = price_data.iloc[-1]
+price_data = load_stock_for_ticker(selected_ticker)
+latest = price_data.iloc[-1].to_dict()
 
 # --- Sidebar Statistics Section ---
 with st.sidebar.expander("📊 Statistics", expanded=False):
@@ -193,12 +908,12 @@ with st.sidebar.expander("📊 Statistics", expanded=False):
         """
 
     # Fetch Simply Wall St facts for this ticker
-    sw_matches = sw_facts_df[sw_facts_df["source_file"] == selected_ticker]
+    sw = sw_by_ticker.get(selected_ticker)
 
-    if sw_matches.empty:
-        sw = pd.Series()   # no data for this ticker
+    if sw is None:
+        sw = {}   # no data for this ticker
     else:
-        sw = sw_matches.iloc[0]  # ALWAYS returns a Series
+        sw = sw.to_dict()  # plain dict: the .get calls below skip the pandas indexer
 
         # --- Valuation Layer ---
         if instrument_type not in ["FUTURE", "INDEX"]:
@@ -210,8 +925,7 @@ with st.sidebar.expander("📊 Statistics", expanded=False):
                 unsafe_allow_html=True
             )
 
-            pe_value = pd.to_numeric(sw.get("pe", 0), errors="coerce")
-            pe_value = 0 if pd.isna(pe_value) else pe_value
+            pe_value = to_float(sw.get("pe"))
 
             st.markdown(f"PE Ratio: <strong>{pe_value:.2f}</strong> 🛈", unsafe_allow_html=True)
             st.markdown(f"PB Ratio: <strong>{sw.get('pb', 0):.2f}</strong> 🛈", unsafe_allow_html=True)
@@ -264,8 +978,8 @@ if instrument_type not in ["FUTURE", "INDEX"]:
         """, unsafe_allow_html=True)
 
 # --- Snowflake Fallback ---
-if selected_ticker in snowflake_df["tickers"].values:
-    snow = snowflake_df[snowflake_df["tickers"] == selected_ticker].squeeze()
+if selected_ticker in snowflake_by_ticker:
+    snow = snowflake_by_ticker[selected_ticker]
 else:
     # Default zero-values for snowflake categories
     snow = pd.Series({
@@ -286,32 +1000,22 @@ st.markdown(
 
 # --- Info and Metrics Display ---
 def colorize(value):
-    try:
-        val_float = float(value)
-        color = "red" if val_float < 0 else "black"
-        return f"<span class='info-value' style='color:{color}'>{val_float:,.0f}</span>"
-    except:
+    if not pd.api.types.is_number(value):
         return f"<span class='info-value'>{value}</span>"
+    val_float = float(value)
+    color = "red" if val_float < 0 else "black"
+    return f"<span class='info-value' style='color:{color}'>{val_float:,.0f}</span>"
 
 colL, colR = st.columns([3, 2])
 
-# Ensure price_data is sorted and latest close is available
-price_data = stock_df[stock_df["tickers"] == selected_ticker].sort_values("trade_date")
-latest = price_data.iloc[-1]
-recent_close = latest.get("close_price", 0)
-
-past_week = price_data.iloc[-5]["close_price"] if len(price_data) >= 5 else recent_close
-past_year = price_data.iloc[-252]["close_price"] if len(price_data) >= 252 else recent_close
-
-change_7d = ((recent_close - past_week) / past_week * 100) if past_week else 0
-change_1y = ((recent_close - past_year) / past_year * 100) if past_year else 0
+# Latest close and recent changes (price_data/latest are loaded above)
+recent_close, change_7d, change_1y = price_change_summary(selected_ticker)
 
 color_7d = "green" if change_7d >= 0 else "red"
 color_1y = "green" if change_1y >= 0 else "red"
 
 # Pull Simply Wall St facts (valuation & fundamentals) for this ticker
-sw_rows = sw_facts_df[sw_facts_df["source_file"] == selected_ticker]
-sw = sw_rows.iloc[0] if not sw_rows.empty else pd.Series(dtype="float64")
+sw = sw_by_ticker[selected_ticker].to_dict() if selected_ticker in sw_by_ticker else {}
 
 currency_iso = str(sw.get("dividend_dividend_currency_iso", "")).strip().upper()
 
@@ -344,10 +1048,9 @@ with colL:
             - red text only if value is negative
             - optional currency symbol before value
             """
-            try:
-                num = float(value)
-            except:
+            if not pd.api.types.is_number(value):
                 return f"<span class='info-value'>{value}</span>"
+            num = float(value)
 
             fmt = f"{{:,.{decimals}f}}" if decimals > 0 else "{:,.0f}"
 
@@ -392,11 +1095,9 @@ with colL:
 
 # --- Dividends ---
 if instrument_type not in ["FUTURE", "INDEX"]:
-    # Filter sw_facts_df to the selected ticker and most recent row
-    sw_latest_rows = sw_facts_df[sw_facts_df["source_file"] == selected_ticker]
-
-    if not sw_latest_rows.empty:
-        sw = sw_latest_rows.iloc[0]  # most recent row for this ticker
+    # Most recent Simply Wall St row for the selected ticker
+    if selected_ticker in sw_by_ticker:
+        sw = sw_by_ticker[selected_ticker].to_dict()
 
         # Estimated Annual Dividend
         estimated_div = sw.get("dividend_current")
@@ -437,82 +1138,15 @@ if instrument_type not in ["FUTURE", "INDEX"]:
 
 with colR:
     # Ensure snowflake data is a single row
-    if selected_ticker in snowflake_df["tickers"].values:
-        snow_rows = snowflake_df[snowflake_df["tickers"] == selected_ticker]
-        snow = snow_rows.iloc[0]
+    if selected_ticker in snowflake_by_ticker:
+        snow = snowflake_by_ticker[selected_ticker]
     else:
-        snow = pd.Series({k: 0 for k in ["value", "future", "past", "health", "dividend"]})
-
-    def build_snowflake_chart(data, label):
-        axes = ["value", "future", "past", "health", "dividend"]
-        labels = [a.title() for a in axes]
-        values = [int(round(data.get(a, 0))) for a in axes]
-
-        # Close the radar polygon
-        r = values + [values[0]]
-        theta = labels + [labels[0]]
-
-        hover_descriptions = {
-            "value": "Is the company undervalued compared to peers and cashflows?",
-            "future": "Forecasted performance in 1–3 years?",
-            "past": "Performance over the last 5 years?",
-            "health": "Financial health and debt levels?",
-            "dividend": "Dividend quality and reliability?"
-        }
-
-        hover_text = [
-            f"<span style='font-size:13px'><b>{lbl}</b>: {val}/6<br>{hover_descriptions[key]}</span>"
-            for key, lbl, val in zip(axes, labels, values)
-        ]
-        hover_text.append(hover_text[0])
+        snow = pd.Series({k: 0 for k in SNOWFLAKE_AXES})
 
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(
-            r=r,
-            theta=theta,
-            fill='toself',
-            line=dict(color="#00ccff", width=4),
-            marker=dict(size=6, color="#00ccff"),
-            hoverinfo="text",
-            hovertext=hover_text
-        ))
-
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0,6],
-                    tickvals=[1,2,3,4,5,6],
-                    ticktext=[
-                        "<span style='color:white'>1</span>",
-                        "<span style='color:white'>2</span>",
-                        "<span style='color:white'>3</span>",
-                        "<span style='color:white'>4</span>",
-                        "<span style='color:white'>5</span>",
-                        "<span style='color:white; font-weight:bold; text-shadow:-1px -1px 0 #000, 1px -1px 0 #000, -1px 1px 0 #000, 1px 1px 0 #000'>6</span>"
-                    ],
-
-                    tickfont=dict(size=12),
-                ),
-                angularaxis=dict(
-                    tickvals=labels,
-                    ticktext=labels,
-                    tickfont=dict(size=14, color="black"),
-                    direction="clockwise",
-                    rotation=90
-                )
-            ),
-            template="plotly_dark",
-            showlegend=False,
-            margin=dict(t=30, b=20, l=55, r=35),
-            width=390,
-            height=351
-        )
-
-        return fig
-
-    fig = build_snowflake_chart(snow, selected_ticker)
-    st.plotly_chart(fig, use_container_width=True)
+    snow_values = tuple(int(round(snow.get(a, 0))) for a in SNOWFLAKE_AXES)
+    fig = build_snowflake_chart(snow_values, selected_ticker)
+    # The radar already carries a fixed 390px size; keep it instead of stretching to the column
+    st.plotly_chart(fig, use_container_width=False)
 
 # =========================================================
 st.markdown("---")
@@ -520,10 +1154,8 @@ st.markdown("---")
 # --- Analyst Price Target + Forward Commentary Section ---
 if instrument_type not in ["FUTURE", "INDEX"]:
 
-    sw_rows = sw_facts_df[sw_facts_df["source_file"] == selected_ticker]
-
-    if not sw_rows.empty:
-        sw_row = sw_rows.iloc[0]  # get first row as Series (scalar access)
+    if selected_ticker in sw_by_ticker:
+        sw_row = sw_by_ticker[selected_ticker]  # latest row as Series (scalar access)
 
         # Analyst price targets
         num_analysts = sw_row.get("value_price_target_analyst_count")
@@ -550,55 +1182,10 @@ if instrument_type not in ["FUTURE", "INDEX"]:
         # -----------------------------
         if pd.notna(target_low) and pd.notna(target_avg) and pd.notna(target_high):
 
-            price_points = {
-                "Lowest Estimate": float(target_low),
-                "Average Estimate": float(target_avg),
-                "Highest Estimate": float(target_high),
-                "Current Price": float(recent_close)
-            }
-
-            sorted_points = sorted(price_points.items(), key=lambda x: x[1])
-
-            fig = go.Figure()
-
-            # Line connecting points
-            fig.add_trace(go.Scatter(
-                x=[p[1] for p in sorted_points],
-                y=[1] * len(sorted_points),
-                mode="lines",
-                line=dict(color="black", width=5),
-                hoverinfo="skip",
-                showlegend=False
-            ))
-
-            # Markers for each point
-            for label, value in sorted_points:
-                is_current = label == "Current Price"
-
-                fig.add_trace(go.Scatter(
-                    x=[value],
-                    y=[1],
-                    mode="markers+text",
-                    marker=dict(
-                        size=14 if is_current else 11,
-                        color="#00ccff" if is_current else "black"
-                    ),
-                    text=[f"<b>{currency_symbol}{value:.2f}</b>" if is_current else f"{currency_symbol}{value:.2f}"],
-                    textposition="top center" if is_current else "bottom center",
-                    textfont=dict(size=22),
-                    hovertext=label,
-                    hoverinfo="text",
-                    hoverlabel=dict(font=dict(size=20)),
-                    showlegend=False
-                ))
-
-            fig.update_layout(
-                xaxis=dict(visible=False),
-                yaxis=dict(visible=False),
-                margin=dict(t=10, b=10, l=20, r=20),
-                height=160
+            fig = build_price_target_chart(
+                float(target_low), float(target_avg), float(target_high),
+                float(recent_close), currency_symbol
             )
-
             st.plotly_chart(fig, use_container_width=True)
 
         else:
@@ -617,7 +1204,8 @@ if instrument_type not in ["FUTURE", "INDEX"]:
             "extended_data_statements_future_revenue_high_growth_description"
         ]
 
-        commentary_text = " ".join([str(sw_row.get(col, "")) for col in commentary_columns if pd.notna(sw_row.get(col))])
+        present = sw_row.reindex(commentary_columns).dropna().astype(str)
+        commentary_text = " ".join(present.tolist())
         if commentary_text:
             st.markdown(
                 f"<div style='margin-top:15px; font-size:16px; color:black;'>{commentary_text}</div>",
@@ -655,60 +1243,85 @@ metric_label_map = {
 # Reverse mapping for internal lookup
 label_to_metric_map = {v: k for k, v in metric_label_map.items()}
 
-# --- Metric selection ---
-selected_labels = st.multiselect(
-    "Select up to 3 metrics:",
-    options=list(metric_label_map.values()),
-    default=[metric_label_map["close_price"]]
-)
+# Long ranges are drawn from weekly bars; anything not listed keeps the week's last value.
+# Sums use min_count=1 so a week without trades stays NaN instead of a fake 0
+CHART_MAX_POINTS = 600
+WEEKLY_AGG = {
+    "open_price": "first",
+    "high_price": "max",
+    "low_price": "min",
+    "dividend": lambda s: s.sum(min_count=1),
+    "split": "max",
+    "volume": lambda s: s.sum(min_count=1),
+}
 
-if len(selected_labels) > 3:
-    st.error("Please select no more than 3 metrics.")
-else:
-    selected_metrics = [label_to_metric_map[label] for label in selected_labels]
-
-    # Ensure trade_date is datetime
-    price_data["trade_date"] = pd.to_datetime(price_data["trade_date"])
-
-    # Date inputs with proper bounds
-    min_date = price_data["trade_date"].min()
-    max_date = price_data["trade_date"].max()
-    col_start, col_end = st.columns(2)
-    with col_start:
-        start_date = st.date_input("Start Date", min_value=min_date.date(), max_value=max_date.date(), value=min_date.date())
-    with col_end:
-        end_date = st.date_input("End Date", min_value=min_date.date(), max_value=max_date.date(), value=max_date.date())
-
-    # Convert selected dates to Timestamps for comparison
-    start_ts = pd.Timestamp(start_date)
-    end_ts = pd.Timestamp(end_date)
-
-    # Filter data safely
-    filtered = price_data[(price_data["trade_date"] >= start_ts) & (price_data["trade_date"] <= end_ts)].copy()
-    filtered.set_index("trade_date", inplace=True)
-
-    if not filtered.empty:
-        # Rename columns for display
-        chart_df = filtered[selected_metrics].rename(columns=metric_label_map)
-        st.line_chart(chart_df)
-
-        # Volume chart if available
-        if "volume" in filtered.columns:
-            volume_fig = go.Figure(data=go.Bar(
-                x=filtered.index,
-                y=filtered["volume"],
-                marker_color="#33ccff"
-            ))
-            volume_fig.update_layout(
-                margin=dict(t=10, b=30),
-                xaxis_title="Date",
-                yaxis_title="Volume",
-                template="plotly_dark",
-                height=300
-            )
-            st.plotly_chart(volume_fig, use_container_width=True)
+# --- Metric selection, date range and charts ---
+# A fragment, so changing metrics or dates reruns only the chart instead of the whole page
+@st.fragment
+def price_chart(price_data):
+    """Metric picker, date range inputs and the price/volume charts for one ticker."""
+    selected_labels = st.multiselect(
+        "Select up to 3 metrics:",
+        options=list(metric_label_map.values()),
+        default=[metric_label_map["close_price"]]
+    )
+
+    if len(selected_labels) > 3:
+        st.error("Please select no more than 3 metrics.")
     else:
-        st.info("No data found for the selected date range.")
+        selected_metrics = [label_to_metric_map[label] for label in selected_labels]
+
+        # Date inputs with proper bounds
+        min_date = price_data["trade_date"].min()
+        max_date = price_data["trade_date"].max()
+        col_start, col_end = st.columns(2)
+        with col_start:
+            start_date = st.date_input("Start Date", min_value=min_date.date(), max_value=max_date.date(), value=min_date.date())
+        with col_end:
+            end_date = st.date_input("End Date", min_value=min_date.date(), max_value=max_date.date(), value=max_date.date())
+
+        # Convert selected dates to Timestamps for comparison
+        start_ts = pd.Timestamp(start_date)
+        end_ts = pd.Timestamp(end_date)
+
+        # Filter data safely
+        filtered = price_data.loc[start_ts:end_ts]
+
+        # Downsample multi-year ranges so the browser gets ~1/5 of the points
+        if len(filtered) > CHART_MAX_POINTS:
+            chart_cols = [c for c in dict.fromkeys(selected_metrics + ["volume"]) if c in filtered]
+            filtered = (
+                filtered[chart_cols]
+                .resample("W")
+                .agg({c: WEEKLY_AGG.get(c, "last") for c in chart_cols})
+                .dropna(how="all")
+            )
+
+        if not filtered.empty:
+            # Rename columns for display
+            chart_df = filtered[selected_metrics].rename(columns=metric_label_map)
+            st.line_chart(chart_df)
+
+            # Volume chart if available
+            if "volume" in filtered.columns:
+                volume_fig = go.Figure(data=go.Bar(
+                    x=filtered.index,
+                    y=filtered["volume"],
+                    marker_color="#33ccff"
+                ))
+                volume_fig.update_layout(
+                    margin=dict(t=10, b=30),
+                    xaxis_title="Date",
+                    yaxis_title="Volume",
+                    template="plotly_dark",
+                    height=300
+                )
+                st.plotly_chart(volume_fig, use_container_width=True)
+        else:
+            st.info("No data found for the selected date range.")
+
+
+price_chart(price_data)
 # -----------------------------
 
 # =========================================================
@@ -721,24 +1334,13 @@ st.markdown(
 
 # --- Sentiment Summary (Last 30 Days) ---
 
-if selected_company_name:
-    news_filtered = news_df[news_df["query_text"] == selected_company_name].copy()
-else:
-    news_filtered = news_df.iloc[0:0].copy()
-
-news_filtered["published_at"] = pd.to_datetime(
-    news_filtered["published_at"], errors="coerce"
-)
+news_filtered = sql["news_by_company"].get(selected_company_name, news_df.iloc[0:0])
 
-cutoff_date = pd.Timestamp.now() - pd.Timedelta(days=30)
-recent_news_30d = news_filtered[news_filtered["published_at"] >= cutoff_date]
+sentiment_summary = sentiment_30d(selected_company_name)
 
-# Compute averages if data exists
-if not recent_news_30d.empty:
-    avg_pos = recent_news_30d["sentiment_positive"].mean()
-    avg_neu = recent_news_30d["sentiment_neutral"].mean()
-    avg_neg = recent_news_30d["sentiment_negative"].mean()
-    count_articles = len(recent_news_30d)
+# Show averages if data exists
+if sentiment_summary is not None:
+    avg_pos, avg_neu, avg_neg, count_articles = sentiment_summary
 
     st.markdown(f"""
     <div style="text-align:center; margin-top:10px; margin-bottom:2px;">
@@ -748,7 +1350,7 @@ if not recent_news_30d.empty:
             <div style="color:red;">Negative: {avg_neg:.2f}</div>
         </div>
         <div style="margin-top:5px; font-size:12px; color:grey;">
-            Based on {count_articles} articles from the last 30 days
+            Based on {int(count_articles)} articles from the last 30 days
         </div>
     </div>
     """, unsafe_allow_html=True)
@@ -762,27 +1364,23 @@ else:
 # --- Most recent 3 articles ---
 news_recent = (
     news_filtered
-    .sort_values("published_at", ascending=False)
-    .head(3)
+    .dropna(subset=["published_at"])
+    .nlargest(3, "published_at")
 )
 
-for _, row in news_recent.iterrows():
-    link = row["link_url"] if pd.notna(row["link_url"]) else "#"
-    source = row["source_name"] if pd.notna(row["source_name"]) else "N/A"
-    title = row["title_text"]
-    published = (
-        row["published_at"].strftime("%Y-%m-%d %H:%M")
-        if pd.notna(row["published_at"]) else ""
-    )
-    sentiment_label = str(row["sentiment_label"])
-
-    color = (
-        "green" if sentiment_label.lower() == "positive"
-        else "red" if sentiment_label.lower() == "negative"
-        else "black"
-    )
-
-    st.markdown(f"""
+# Column-wise formatting, then one markdown call for all articles
+links = news_recent["link_url"].fillna("#").to_numpy()
+sources = news_recent["source_name"].fillna("N/A").to_numpy()
+titles = news_recent["title_text"].to_numpy()
+published_dates = news_recent["published_at"].dt.strftime("%Y-%m-%d %H:%M").fillna("").to_numpy()
+sentiment_labels = news_recent["sentiment_label"].astype(str).to_numpy()
+sentiment_colors = news_recent["sentiment_color"].to_numpy()
+
+news_blocks = []
+for link, source, title, published, sentiment_label, color in zip(
+    links, sources, titles, published_dates, sentiment_labels, sentiment_colors
+):
+    news_blocks.append(f"""
     <div style="margin:0 auto 20px auto; max-width:750px;">
         <div style="display:flex; align-items:center; margin-bottom:15px; flex-wrap:wrap;">
             <div style="
@@ -811,7 +1409,10 @@ for _, row in news_recent.iterrows():
             </div>
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """)
+
+if news_blocks:
+    st.markdown("".join(news_blocks), unsafe_allow_html=True)
 
 # ===========================Extended Statistics==============================
 
@@ -821,99 +1422,575 @@ st.markdown(
     "<h2 style='text-align: center; font-weight:bold;'>Extended Analysis</h2>",
     unsafe_allow_html=True
 )
+# Latest Simply Wall St row for the ticker, looked up once for every section below
+facts_row = (
+    sw_by_ticker[selected_ticker]
+    if selected_ticker in sw_by_ticker
+    else pd.Series(index=sw_facts_df.columns, dtype="float64")
+)
+# Plain-dict copy for scalar reads; Series indexing re-resolves the label on every access
+facts = facts_row.to_dict()
+
+# Company / industry / all-companies columns behind the Value comparison charts
+VALUE_COMPARE_COLS = [
+    "extended_data_scores_value",
+    "extended_data_industry_averages_value_score",
+    "extended_data_industry_averages_all_value_score",
+    "value_pe",
+    "extended_data_industry_averages_pe",
+    "extended_data_industry_averages_all_pe",
+    "value_pb",
+    "extended_data_industry_averages_pb",
+    "extended_data_industry_averages_all_pb",
+    "value_peg",
+    "extended_data_industry_averages_peg",
+    "extended_data_industry_averages_all_peg",
+    "value_intrinsic_discount",
+    "extended_data_industry_averages_intrinsic_discount",
+    "extended_data_industry_averages_all_intrinsic_discount",
+    "roe",
+    "extended_data_industry_averages_roe",
+    "extended_data_industry_averages_all_roe",
+    "roa",
+    "extended_data_industry_averages_roa",
+    "extended_data_industry_averages_all_roa",
+    "value_intrinsic_value_levered_beta",
+    "extended_data_industry_averages_levered_beta",
+    "extended_data_industry_averages_all_levered_beta",
+    "value_intrinsic_value_unlevered_beta",
+    "extended_data_industry_averages_unlevered_beta",
+    "extended_data_industry_averages_all_unlevered_beta",
+]
+
+# Value Statistics: display label -> column, alphabetized and split into two columns once
+VALUE_STATS = {
+    "Capital to Revenue Ratio (3yr Avg)": "value_intrinsic_value_two_stage_fcf_capital_to_revenue_ratio_3yr_avg",
+    "Cost of Equity": "value_intrinsic_value_cost_of_equity",
+    "Intrinsic Value ADR/Share": "value_intrinsic_value_adr_per_share",
+    "Market Cap Band": "value_market_cap_band",
+    "NPV per Share": "value_npv_per_share",
+    "PV 5Y": "value_intrinsic_value_pv_5y",
+    "PV TV": "value_intrinsic_value_pvtv",
+    "Risk Free Rate": "value_intrinsic_value_risk_free_rate",
+    "Tax Rate": "value_intrinsic_value_tax_rate",
+    "Two Stage FCF CAGR 5Y": "value_intrinsic_value_two_stage_fcf_growth_cagr_5y",
+    "Two Stage FCF Shares Outstanding": "value_intrinsic_value_two_stage_fcf_shares_outstanding",
+    "Equity Premium": "value_intrinsic_value_equity_premium",
+    "EV to EBITDA": "value_ev_to_ebitda",
+    "EV to Sales": "value_ev_to_sales",
+    "Excess Return": "value_intrinsic_value_excess_returns_excess_return",
+    "Excess Returns Book Value": "value_intrinsic_value_excess_returns_book_value",
+    "Excess Returns Equity Cost": "value_intrinsic_value_excess_returns_equity_cost",
+    "Excess Returns ROE Average": "value_intrinsic_value_excess_returns_return_on_equity_avg",
+    "Excess Returns Stable Book Value": "value_intrinsic_value_excess_returns_stable_book_value",
+    "Excess Returns Stable EPS": "value_intrinsic_value_excess_returns_stable_eps",
+    "Terminal Value": "value_intrinsic_value_terminal_value",
+}
+VALUE_STATS_LABELS = sorted(VALUE_STATS)
+VALUE_STATS_LEFT = VALUE_STATS_LABELS[:len(VALUE_STATS_LABELS) // 2]
+VALUE_STATS_RIGHT = VALUE_STATS_LABELS[len(VALUE_STATS_LABELS) // 2:]
+
+# Value Forecasts: years and their forecast / discounted FCF columns
+VALUE_FORECAST_YEARS = [2026, 2027, 2028, 2029, 2030, 2031, 2032, 2033, 2034, 2035]
+VALUE_FORECAST_COLS = [
+    "value_intrinsic_value_two_stage_fcf_first_stage_2026_data",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2027_data",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2028_data",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2029_data",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2030_data",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2031_data",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2032_data",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2033_data",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2034_data",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2035_data"
+]
+VALUE_DISCOUNTED_COLS = [
+    "value_intrinsic_value_two_stage_fcf_first_stage_2026_discounted",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2027_discounted",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2028_discounted",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2029_discounted",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2030_discounted",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2031_discounted",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2032_discounted",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2033_discounted",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2034_discounted",
+    "value_intrinsic_value_two_stage_fcf_first_stage_2035_discounted"
+]
+VALUE_FORECAST_YEAR_LABELS = [str(year) for year in VALUE_FORECAST_YEARS]
+
+# Health Statistics columns, including the industry analysis metrics
+HEALTH_STATS_COLS = [
+    "health_accounts_payable",
+    "health_accounts_receivable_percent",
+    "health_accounts_receivable_growth_1y",
+    "health_aggregate_accruals",
+    "health_capex",
+    "health_capex_growth_1y",
+    "health_capex_growth_annual",
+    "health_cash_from_investing",
+    "health_cash_from_investing_1y",
+    "health_cash_operating",
+    "health_cash_operating_growth_1y",
+    "health_current_assets",
+    "health_current_assets_to_long_term_liab",
+    "health_current_assets_to_total_debt",
+    "health_current_portion_lease_liabilities",
+    "health_current_solvency_ratio",
+    "health_debt_to_equity_ratio",
+    "health_debt_to_equity_ratio_past",
+    "health_fixed_to_total_assets",
+    "health_inventory",
+    "health_inventory_growth_1y",
+    "health_last_balance_sheet_update",
+    "health_levered_free_cash_flow_break_even_years",
+    "health_levered_free_cash_flow_growth_annual",
+    "health_levered_free_cash_flow_growth_years",
+    "health_levered_free_cash_flow_stable_years",
+    "health_long_term_assets",
+    "health_long_term_debt",
+    "health_long_term_liab",
+    "health_long_term_portion_lease_liabilities",
+    "health_management_rate_return",
+    "health_median_2yr_net_income",
+    "health_net_debt",
+    "health_net_debt_to_ebitda",
+    "health_net_debt_to_equity",
+    "health_net_income",
+    "health_net_interest_cover",
+    "health_net_interest_expense",
+    "health_net_operating_assets",
+    "health_net_operating_assets_1y",
+    "health_operating_cash_flow_to_total_debt",
+    "health_operating_expenses",
+    "health_operating_expenses_growth_annual",
+    "health_operating_expenses_growth_years",
+    "health_operating_expenses_stable_years",
+    "health_ppe",
+    "health_receivables",
+    "health_restricted_cash",
+    "health_restricted_cash_ratio",
+    "health_total_assets",
+    "health_total_debt",
+    "health_total_equity",
+    "health_total_inventory",
+    "health_total_liab_equity",
+    "health_total_lease_liabilities",
+    "health_total_debt_equity",
+    # Industry analysis metrics
+    "health_industry_analysis_net_int_margin",
+    "health_industry_analysis_net_loans",
+    "health_industry_analysis_net_loans_to_deposits",
+    "health_industry_analysis_net_loans_to_total_assets",
+    "health_industry_analysis_non_perf_loans_total_loans",
+    "health_industry_analysis_loan_losses",
+    "health_industry_analysis_allowance_loan_losses",
+    "health_industry_analysis_allowance_non_perf_loans",
+    "health_industry_analysis_total_bank_liabilities",
+    "health_industry_analysis_total_deposits",
+    "health_capitalisation_percent",
+    "health_capitalisation_percent_1y",
+    "health_book_value_per_share",
+]
+
+# Future Statistics columns
+FUTURE_STATS_COLS = [
+    "future_roe_1y",
+    "future_roe_3y",
+    "future_return_on_equity_1y",
+    "future_return_on_equity_3y",
+    "future_earnings_per_share_growth_1y",
+    "future_earnings_per_share_growth_3y",
+    "future_minimum_earnings_growth",
+    "future_earnings_per_share_growth_annual",
+    "future_revenue_growth_annual",
+    "future_cash_ops_growth_annual",
+    "future_net_income_growth_annual",
+    "future_ebitda_1y",
+    "future_ebitda_growth_1y",
+    "future_forward_pe_1y",
+    "future_forward_price_to_sales_1y",
+    "future_forward_ev_to_ebitda_1y",
+    "future_forward_ev_to_sales_1y",
+    "future_gross_profit_margin_1y"
+]
+
+
+def stat_display_name(col):
+    """Readable label for a Health/Future statistic column."""
+    # Drop "future" only when it is followed by "forward"
+    if col.startswith("future_forward_"):
+        col = col[len("future_"):]
+    return (
+        col.replace("health_", "")
+        .replace("industry_analysis_", "")
+        .replace("_", " ")
+        .title()
+    )
+
+
+DISPLAY_NAMES = {col: stat_display_name(col) for col in HEALTH_STATS_COLS + FUTURE_STATS_COLS}
+
+# Display order, sorted once: Health by column name without its prefixes, Future by label
+HEALTH_STATS_SORTED = tuple(sorted(
+    HEALTH_STATS_COLS,
+    key=lambda x: x.replace("health_", "").replace("industry_analysis_", "").lower()
+))
+FUTURE_STATS_SORTED = tuple(sorted(FUTURE_STATS_COLS, key=DISPLAY_NAMES.get))
+
+
+def stat_rows_html(pairs):
+    """One HTML block of "name: value" rows, emitted with a single st.markdown per column."""
+    return "".join(
+        f"<div style='margin-bottom:12px;'>"
+        f"<span style='font-size:20px;'>{name}:</span>"
+        f"<span style='font-size:24px; font-weight:bold;'> {val}</span>"
+        f"</div>"
+        for name, val in pairs
+    )
+
+
+def stat_display_values(row, dtypes, cols, missing="N/A"):
+    """{col: display string} for cols: numbers rounded to 3, dates as YYYY-MM-DD, text as-is."""
+    vals = row.reindex(cols)
+    col_dtypes = dtypes.reindex(cols)
+    is_num = col_dtypes.map(pd.api.types.is_numeric_dtype).fillna(False).astype(bool)
+    is_date = col_dtypes.map(pd.api.types.is_datetime64_any_dtype).fillna(False).astype(bool)
+    # Numbers held in object columns (e.g. pyodbc Decimals) are rounded too
+    is_obj_num = ~is_num & ~is_date & vals.map(pd.api.types.is_number).astype(bool)
+
+    out = vals.astype(object)
+    out[is_num] = pd.to_numeric(vals[is_num], errors="coerce").round(3).astype(object)
+    out[is_obj_num] = vals[is_obj_num].map(lambda v: round(float(v), 3))
+    out[is_date] = pd.to_datetime(vals[is_date], errors="coerce").dt.strftime("%Y-%m-%d").astype(object)
+    # Stringified in one pass, so the HTML rows only interpolate ready-made text
+    return out.where(out.notna(), missing).astype(str).to_dict()
+
+
+# Health History graphs: (title, history columns), with the flat column list and each graph's end offset
+HISTORY_GRAPHS = (
+    ("Net Operating Assets History By Year", (
+        "health_net_operating_assets_ltm_history_0",
+        "health_net_operating_assets_ltm_history_1",
+        "health_net_operating_assets_ltm_history_2",
+        "health_net_operating_assets_ltm_history_3"
+    )),
+    ("Aggregate Accruals History By Year", (
+        "health_aggregate_accruals_ltm_history_0",
+        "health_aggregate_accruals_ltm_history_1",
+        "health_aggregate_accruals_ltm_history_2",
+        "health_aggregate_accruals_ltm_history_3"
+    )),
+    ("Accrual Ratio From Cashflow History By Year", (
+        "health_accrual_ratio_from_cashflow_ltm_history_0",
+        "health_accrual_ratio_from_cashflow_ltm_history_1",
+        "health_accrual_ratio_from_cashflow_ltm_history_2"
+    )),
+    ("Total Assets History By Year", (
+        "health_total_assets_ltm_history_0",
+        "health_total_assets_ltm_history_1",
+        "health_total_assets_ltm_history_2",
+        "health_total_assets_ltm_history_3",
+        "health_total_assets_ltm_history_4",
+        "health_total_assets_ltm_history_5"
+    )),
+    ("Total Current Liabilities History By Year", (
+        "health_total_current_liab_ltm_history_0",
+        "health_total_current_liab_ltm_history_1",
+        "health_total_current_liab_ltm_history_2",
+        "health_total_current_liab_ltm_history_3",
+        "health_total_current_liab_ltm_history_4",
+        "health_total_current_liab_ltm_history_5"
+    )),
+)
+HISTORY_COLS = [col for _, cols in HISTORY_GRAPHS for col in cols]
+HISTORY_ENDS = tuple(np.cumsum([len(cols) for _, cols in HISTORY_GRAPHS]))
+
+# Future Forecasts graphs: (title, 1y/2y/3y columns)
+FORECAST_GRAPHS = (
+    ("Forecasted Earnings Per Share",
+     ("future_earnings_per_share_1y", "future_earnings_per_share_2y", "future_earnings_per_share_3y")),
+    ("Forecasted Revenue Growth",
+     ("future_revenue_growth_1y", "future_revenue_growth_2y", "future_revenue_growth_3y")),
+    ("Forecasted Revenue",
+     ("future_revenue_1y", "future_revenue_2y", "future_revenue_3y")),
+    ("Forecasted Cash Ops Growth",
+     ("future_cash_ops_growth_1y", "future_cash_ops_growth_2y", "future_cash_ops_growth_3y")),
+    ("Forecasted Cash Ops",
+     ("future_cash_ops_1y", "future_cash_ops_2y", "future_cash_ops_3y")),
+    ("Forecasted Net Income Growth",
+     ("future_net_income_growth_1y", "future_net_income_growth_2y", "future_net_income_growth_3y")),
+    ("Forecasted Net Income",
+     ("future_net_income_1y", "future_net_income_2y", "future_net_income_3y")),
+)
+FORECAST_COLS = [col for _, cols in FORECAST_GRAPHS for col in cols]
+FORECAST_TITLES = tuple(title for title, _ in FORECAST_GRAPHS)
+
+# Past History graphs: (title, columns, x labels), with the flat column list and each graph's end offset
+YEARS_1_3_5 = ("1 Year", "3 Year", "5 Year")
+
+
+def ltm_history_graph(title, prefix, years):
+    """(title, columns, labels) for a Year 0..N-1 LTM history series."""
+    return (
+        title,
+        tuple(f"{prefix}_ltm_history_{i}" for i in range(years)),
+        tuple(f"Year {i}" for i in range(years)),
+    )
+
+
+def growth_graph(title, prefix):
+    """(title, columns, labels) for a 1y/3y/5y series."""
+    return (title, tuple(f"{prefix}_{n}y" for n in (1, 3, 5)), YEARS_1_3_5)
+
+
+PAST_HISTORY_GRAPHS = (
+    ltm_history_graph("Revenue (LTM) History", "past_revenue", 11),
+    ltm_history_graph("Net Income (LTM) History", "past_net_income", 11),
+    ltm_history_graph("Earnings Per Share (LTM) History", "past_earnings_per_share", 11),
+    growth_graph("Earnings Per Share (1Y/3Y/5Y)", "past_earnings_per_share"),
+    growth_graph("EPS Growth (1Y/3Y/5Y)", "past_earnings_per_share_growth"),
+    ("Net Income (1Y → 5Y)",
+     tuple(f"past_net_income_{i}y" for i in range(1, 6)),
+     tuple(f"{i} Year" for i in range(1, 6))),
+    growth_graph("Net Income Growth (1Y/3Y/5Y)", "past_net_income_growth"),
+    growth_graph("Revenue Growth (1Y/3Y/5Y)", "past_revenue_growth"),
+    ltm_history_graph("EBIT (LTM) History", "past_ebit", 6),
+    growth_graph("EBIT Growth (1Y/3Y/5Y)", "past_ebit_single_growth"),
+    ltm_history_graph("Capital Employed (LTM) History", "past_capital_employed", 6),
+    ltm_history_graph("Return on Capital Employed (LTM) History", "past_return_on_capital_employed", 6),
+)
+PAST_HISTORY_COLS = [col for _, cols, _ in PAST_HISTORY_GRAPHS for col in cols]
+PAST_HISTORY_ENDS = tuple(np.cumsum([len(cols) for _, cols, _ in PAST_HISTORY_GRAPHS]))
+PAST_HISTORY_TITLES = tuple(title for title, _, _ in PAST_HISTORY_GRAPHS)
+PAST_HISTORY_LABELS = tuple(labels for _, _, labels in PAST_HISTORY_GRAPHS)
+
+# Past / Dividend / Management Statistics columns
+PAST_STATS_COLS = (
+    "past_revenue_usd",
+    "past_operating_revenue",
+    "past_net_income_usd",
+    "past_earnings_per_share",
+    "past_earnings_per_share_5y_avg",
+    "past_ebt_excluding",
+    "past_earnings_continued_ops",
+    "past_total_assets",
+    "past_total_equity",
+    "past_current_liabilities",
+    "past_return_on_equity",
+    "past_return_on_assets",
+    "past_return_on_capital_employed",
+    "past_return_on_capital_employed_past",
+    "past_return_on_capital_growth",
+    "past_net_income_5y_avg",
+    "past_last_earnings_update",
+    "past_last_earnings_update_annual",
+    "past_industry_analysis_d_a_expense",
+    "past_industry_analysis_r_d_expense",
+    "past_industry_analysis_non_op_expense",
+    "past_industry_analysis_sales_marketing",
+    "past_industry_analysis_revenue_segments_banking",
+    "past_industry_analysis_stock_based_comp",
+    "past_industry_analysis_general_administrative",
+    "past_industry_analysis_selling_general_admin_expenses",
+    "past_ebit",
+    "past_ebit_3y_avg",
+    "past_ebit_5y_avg",
+    "past_earnings_per_share_single_growth_3y",
+    "past_earnings_per_share_single_growth_5y",
+    "past_gross_profit_margin_1y",
+    "past_net_income_margin",
+    "past_net_income_margin_1y",
+    "past_change_in_unearned_revenue",
+    "past_unearned_revenue_percent_of_sales",
+    "past_ebt_including",
+    "past_unusual_items",
+    "past_unusual_item_ratio",
+    "past_operating_revenue_percent",
+    "past_years_profitable",
+    "past_trading_since_years",
+    "past_non_operating_revenue",
+    "past_non_operating_revenue_ratio",
+    "past_non_operating_revenue_ratio_delta",
+    "past_income_tax_to_ebit_ratio",
+    "past_business_revenue_segments_banking",
+    "past_selling_general_admin_expense",
+    "past_research_development_expense",
+    "past_sales_marketing_expense",
+    "past_stock_based_compensation",
+    "past_depreciation_amortization",
+    "past_general_admin_expense",
+    "past_non_operating_expense",
+    "past_last_processed_filing_date",
+    "past_last_company_filing_date",
+    "past_last_announced_date",
+)
+
+DIVIDEND_STATS_COLS = (
+    "dividend_current",
+    "dividend_future",
+    "dividend_dividend_paying_years",
+    "dividend_payout_ratio",
+    "dividend_payout_ratio_3y",
+    "dividend_dividend_yield_growth_annual",
+    "dividend_first_payment",
+    "dividend_last_payment",
+    "dividend_buyback_yield",
+    "dividend_total_shareholder_yield",
+    "dividend_payout_ratio_median_3yr",
+    "dividend_dividend_payments_growth_annual",
+    "dividend_dividend_payments_ltm",
+    "dividend_cash_payout_ratio",
+    "dividend_dividend_currency_iso",
+
+    # value_intrinsic_value fields
+    "value_intrinsic_value_dividend_discount_dps",
+    "value_intrinsic_value_dividend_discount_roe",
+    "value_intrinsic_value_dividend_discount_payout",
+    "value_intrinsic_value_dividend_discount_ddm_growth",
+    "value_intrinsic_value_dividend_discount_npv_per_share",
+    "value_intrinsic_value_dividend_discount_expected_growth",
+
+    # upcoming dividend data (dates included)
+    "dividend_upcoming_dividend_date",
+    "dividend_upcoming_dividend_amount",
+    "dividend_upcoming_dividend_pay_date",
+    "dividend_upcoming_dividend_record_date",
+    "dividend_upcoming_dividend_adjustment_factor",
+    "dividend_upcoming_dividend_split_adjusted_amount",
+)
+
+# The bare ceoover_compensation_statement_data column is deliberately left out
+MGMT_STATS_COLS = (
+    "health_management_rate_return",
+    "management_management_tenure",
+    "management_board_tenure",
+    "management_management_age",
+    "management_board_age",
+    "management_insider_buying_ratio",
+    "management_total_shares_bought",
+    "management_total_shares_sold",
+    "management_total_employees",
+    "management_ceo_salary_growth_1y",
+
+    # CEO compensation statement data
+    "extended_data_statements_management_ceoover_compensation_statement_data_ceo_name",
+    "extended_data_statements_management_ceoover_compensation_statement_data_market",
+    "extended_data_statements_management_ceoover_compensation_statement_data_median_compensation_usd",
+    "extended_data_statements_management_ceoover_compensation_statement_data_ceo_compensation_total_usd",
+    "extended_data_statements_management_ceosalary_growth_statement_data_earnings_per_share",
+)
+
+
+def past_display_name(col):
+    """Readable label for a Past statistic column."""
+    return (
+        col.replace("past_", "")
+        .replace("_", " ")
+        .replace("industry analysis ", "")
+        .replace("revenue segments ", "")
+        .title()
+    )
+
+
+# Drops the value_intrinsic_value_ prefix and the second of a doubled "dividend"
+DIVIDEND_LABEL_RE = re.compile(r"value_intrinsic_value_|(?<=dividend)_dividend")
+UNDERSCORE_TO_SPACE = str.maketrans("_", " ")
+
+
+def dividend_display_name(col):
+    """Readable label for a Dividend statistic column."""
+    return DIVIDEND_LABEL_RE.sub("", col).translate(UNDERSCORE_TO_SPACE).title()
+
+
+def mgmt_display_name(col):
+    """Readable label for a Management statistic column."""
+    disp = (
+        col.replace("health_", "")
+        .replace("management_management_", "management_")
+        .replace("extended_data_statements_management_", "")
+        .replace("ceoover_compensation_statement_data_", "")
+        .replace("ceosalary_growth_statement_data_", "")
+        .replace("management_", "management ")
+        .replace("_", " ")
+    )
+    # Collapse double spaces left by the replacements
+    return " ".join(disp.split()).title()
+
+
+# (label, col) pairs, built and sorted once; a repeated label keeps its last column
+PAST_STATS_ITEMS = tuple(sorted(
+    ((past_display_name(col), col) for col in PAST_STATS_COLS), key=lambda x: x[0]
+))
+DIVIDEND_STATS_ITEMS = tuple(sorted(
+    {dividend_display_name(col): col for col in DIVIDEND_STATS_COLS}.items(),
+    key=lambda x: x[0].lower()
+))
+MGMT_STATS_ITEMS = tuple(sorted(
+    {mgmt_display_name(col): col for col in MGMT_STATS_COLS}.items()
+))
+
+# Company Holders / Insider Trading table columns and their display headers
+HOLDER_DISPLAY_NAMES = {
+    "owner_name": "Owner Name",
+    "owner_type": "Owner Type",
+    "shares_held": "Shares Held",
+    "percent_shares_outstanding": "Percent Shares Outstanding",
+    "percent_of_portfolio": "Percent of Portfolio",
+    "holding_date": "Holding Date"
+}
+INSIDER_DISPLAY_NAMES = {
+    "filing_date": "Filing Date",
+    "owner_name": "Owner Name",
+    "owner_type": "Owner Type",
+    "transaction_type": "Transaction Type",
+    "shares": "Shares",
+    "price_max": "Price Max",
+    "transaction_value": "Transaction Value",
+}
+
+# Only the display columns the loaded tables actually have
+HOLDER_DISPLAY_COLS = [col for col in HOLDER_DISPLAY_NAMES if col in sql["company_info"].columns]
+INSIDER_DISPLAY_COLS = [col for col in INSIDER_DISPLAY_NAMES if col in sql["insider_transactions"].columns]
+
 # --- MAIN EXPANDER: VALUE ---
 with st.expander("Value", expanded=False):
 
     # Sub-expander: Comparisons
     with st.expander("Comparisons", expanded=False):
 
-        # ------------------------------
-        # Define colors once
-        # ------------------------------
-        ICE_BLUE = "#7FDBFF"
-        GRAY = "#888888"
-        BLACK = "#000000"
-
-        # ------------------------------
-        # Helper function to create bar charts
-        # ------------------------------
-        def create_bar_chart(company_val, industry_val, all_val, title,
-                            company_label, industry_label, all_label):
-
-            fig = go.Figure(
-                data=[
-                    go.Bar(name=company_label, x=["Company"], y=[company_val], marker_color=ICE_BLUE,
-                        hoverinfo="skip", text=[f"<b>{company_val}</b>"], textposition="auto", textfont=dict(size=14)),
-                    go.Bar(name=industry_label, x=["Industry"], y=[industry_val], marker_color=GRAY,
-                        hoverinfo="skip", text=[f"<b>{industry_val}</b>"], textposition="auto", textfont=dict(size=14)),
-                    go.Bar(name=all_label, x=["All Companies"], y=[all_val], marker_color=BLACK,
-                        hoverinfo="skip", text=[f"<b>{all_val}</b>"], textposition="auto", textfont=dict(size=14)),
-                ]
-            )
-            fig.update_layout(
-                title=dict(text=title, x=0.5, xanchor="center", font=dict(size=22, color="black")),
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False),
-                plot_bgcolor="white",
-                paper_bgcolor="white",
-                font_color="black",
-                showlegend=False,
-                height=350,
-                margin=dict(l=20, r=20, t=60, b=20)
-            )
-            return fig
-
-        # ------------------------------
-        # Helper: Format large numbers as billions
-        # ------------------------------
-        def format_billions(x):
-            try:
-                return round(float(x) / 1_000_000_000, 3)
-            except:
-                return 0
+        # All comparison scalars in one gather + vectorized round
+        compare_vals = facts_row.reindex(VALUE_COMPARE_COLS).astype(float).round(3)
 
         # ---------------------------------------------------------
         # ROW 0: VALUE SCORE (LEFT) + MARKET CAP (RIGHT)
         # ---------------------------------------------------------
         col_vs_left, col_mc_right = st.columns(2)
 
-        value_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                            "extended_data_scores_value"].iloc[0], 3)
-        value_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                            "extended_data_industry_averages_value_score"].iloc[0], 3)
-        value_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                        "extended_data_industry_averages_all_value_score"].iloc[0], 3)
+        value_company = compare_vals["extended_data_scores_value"]
+        value_industry = compare_vals["extended_data_industry_averages_value_score"]
+        value_all = compare_vals["extended_data_industry_averages_all_value_score"]
 
         with col_vs_left:
             st.plotly_chart(create_bar_chart(value_company, value_industry, value_all,
-                                            "Value Score", "Company VS", "Industry VS", "All Company VS"),
+                                            "Value Score", "Company VS", "Industry VS", "All Company VS",
+                                            legend=("Company Value Score", "Industry Value Score", "All Company Value Score")),
                             use_container_width=True)
-            st.markdown(f"""
-                <div style="font-size:12px; margin-top:-10px; text-align:center;">
-                    <span style="color:{ICE_BLUE}; font-weight:bold;">■</span> Company Value Score &nbsp;&nbsp;
-                    <span style="color:{GRAY}; font-weight:bold;">■</span> Industry Value Score &nbsp;&nbsp;
-                    <span style="color:{BLACK}; font-weight:bold;">■</span> All Company Value Score
-                </div>
-            """, unsafe_allow_html=True)
 
-        mc_company = format_billions(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                                    "value_market_cap"].iloc[0])
-        mc_industry = format_billions(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                                    "extended_data_industry_averages_market_cap"].iloc[0])
-        mc_all = format_billions(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                                "extended_data_industry_averages_all_market_cap"].iloc[0])
+        # Market caps in billions; missing values show as 0
+        mc_company, mc_industry, mc_all = np.nan_to_num(
+            facts_row.reindex([
+                "value_market_cap",
+                "extended_data_industry_averages_market_cap",
+                "extended_data_industry_averages_all_market_cap",
+            ]).to_numpy(dtype=float) / 1_000_000_000,
+            nan=0.0
+        ).round(3)
 
         with col_mc_right:
             st.plotly_chart(create_bar_chart(mc_company, mc_industry, mc_all,
-                                            "Market Cap (Billions)", "Company MC", "Industry MC", "All Company MC"),
+                                            "Market Cap (Billions)", "Company MC", "Industry MC", "All Company MC",
+                                            legend=("Company Market Cap", "Industry Market Cap", "All Company Market Cap")),
                             use_container_width=True)
-            st.markdown(f"""
-                <div style="font-size:12px; margin-top:-10px; text-align:center;">
-                    <span style="color:{ICE_BLUE}; font-weight:bold;">■</span> Company Market Cap &nbsp;&nbsp;
-                    <span style="color:{GRAY}; font-weight:bold;">■</span> Industry Market Cap &nbsp;&nbsp;
-                    <span style="color:{BLACK}; font-weight:bold;">■</span> All Company Market Cap
-                </div>
-            """, unsafe_allow_html=True)
 
         st.markdown("<div style='height:50px'></div>", unsafe_allow_html=True)
 
@@ -922,13 +1999,13 @@ with st.expander("Value", expanded=False):
         # ---------------------------------------------------------
         col_left, col_right = st.columns(2)
 
-        pe_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "value_pe"].iloc[0], 3)
-        pe_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_pe"].iloc[0], 3)
-        pe_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_pe"].iloc[0], 3)
+        pe_company = compare_vals["value_pe"]
+        pe_industry = compare_vals["extended_data_industry_averages_pe"]
+        pe_all = compare_vals["extended_data_industry_averages_all_pe"]
 
-        pb_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "value_pb"].iloc[0], 3)
-        pb_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_pb"].iloc[0], 3)
-        pb_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_pb"].iloc[0], 3)
+        pb_company = compare_vals["value_pb"]
+        pb_industry = compare_vals["extended_data_industry_averages_pb"]
+        pb_all = compare_vals["extended_data_industry_averages_all_pb"]
 
         with col_left:
             st.plotly_chart(create_bar_chart(pe_company, pe_industry, pe_all,
@@ -947,13 +2024,13 @@ with st.expander("Value", expanded=False):
         # ---------------------------------------------------------
         col_left2, col_right2 = st.columns(2)
 
-        peg_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "value_peg"].iloc[0], 3)
-        peg_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_peg"].iloc[0], 3)
-        peg_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_peg"].iloc[0], 3)
+        peg_company = compare_vals["value_peg"]
+        peg_industry = compare_vals["extended_data_industry_averages_peg"]
+        peg_all = compare_vals["extended_data_industry_averages_all_peg"]
 
-        discount_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "value_intrinsic_discount"].iloc[0], 3)
-        discount_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_intrinsic_discount"].iloc[0], 3)
-        discount_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_intrinsic_discount"].iloc[0], 3)
+        discount_company = compare_vals["value_intrinsic_discount"]
+        discount_industry = compare_vals["extended_data_industry_averages_intrinsic_discount"]
+        discount_all = compare_vals["extended_data_industry_averages_all_intrinsic_discount"]
 
         with col_left2:
             st.plotly_chart(create_bar_chart(peg_company, peg_industry, peg_all,
@@ -972,13 +2049,13 @@ with st.expander("Value", expanded=False):
         # ---------------------------------------------------------
         col_left3, col_right3 = st.columns(2)
 
-        roe_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "roe"].iloc[0], 3)
-        roe_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_roe"].iloc[0], 3)
-        roe_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_roe"].iloc[0], 3)
+        roe_company = compare_vals["roe"]
+        roe_industry = compare_vals["extended_data_industry_averages_roe"]
+        roe_all = compare_vals["extended_data_industry_averages_all_roe"]
 
-        roa_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "roa"].iloc[0], 3)
-        roa_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_roa"].iloc[0], 3)
-        roa_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_roa"].iloc[0], 3)
+        roa_company = compare_vals["roa"]
+        roa_industry = compare_vals["extended_data_industry_averages_roa"]
+        roa_all = compare_vals["extended_data_industry_averages_all_roa"]
 
         with col_left3:
             st.plotly_chart(create_bar_chart(roe_company, roe_industry, roe_all,
@@ -997,19 +2074,13 @@ with st.expander("Value", expanded=False):
         # ---------------------------------------------------------
         col_left4, col_right4 = st.columns(2)
 
-        levered_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                                "value_intrinsic_value_levered_beta"].iloc[0], 3)
-        levered_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                                "extended_data_industry_averages_levered_beta"].iloc[0], 3)
-        levered_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                            "extended_data_industry_averages_all_levered_beta"].iloc[0], 3)
+        levered_company = compare_vals["value_intrinsic_value_levered_beta"]
+        levered_industry = compare_vals["extended_data_industry_averages_levered_beta"]
+        levered_all = compare_vals["extended_data_industry_averages_all_levered_beta"]
 
-        unlevered_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                                "value_intrinsic_value_unlevered_beta"].iloc[0], 3)
-        unlevered_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                                "extended_data_industry_averages_unlevered_beta"].iloc[0], 3)
-        unlevered_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker,
-                                            "extended_data_industry_averages_all_unlevered_beta"].iloc[0], 3)
+        unlevered_company = compare_vals["value_intrinsic_value_unlevered_beta"]
+        unlevered_industry = compare_vals["extended_data_industry_averages_unlevered_beta"]
+        unlevered_all = compare_vals["extended_data_industry_averages_all_unlevered_beta"]
 
         with col_left4:
             st.plotly_chart(create_bar_chart(levered_company, levered_industry, levered_all,
@@ -1028,158 +2099,66 @@ with st.expander("Value", expanded=False):
 
         col_left_vs, col_right_vs = st.columns(2)
 
-        # Helper: safely extract & round number
-        def get_val(col):
-            try:
-                val = sw_facts_df.loc[
-                    sw_facts_df["source_file"] == selected_ticker, col
-                ].iloc[0]
-
-                if isinstance(val, str):
-                    return val  # text fields (e.g., Market Cap Band)
-
-                return round(val, 3)
-            except:
-                return "N/A"
-
-        # -----------------------------------------
-        # COMBINED LIST OF ALL LABELS/METRICS
-        # -----------------------------------------
-        all_items = {
-            "Capital to Revenue Ratio (3yr Avg)": "value_intrinsic_value_two_stage_fcf_capital_to_revenue_ratio_3yr_avg",
-            "Cost of Equity": "value_intrinsic_value_cost_of_equity",
-            "Intrinsic Value ADR/Share": "value_intrinsic_value_adr_per_share",
-            "Market Cap Band": "value_market_cap_band",
-            "NPV per Share": "value_npv_per_share",
-            "PV 5Y": "value_intrinsic_value_pv_5y",
-            "PV TV": "value_intrinsic_value_pvtv",
-            "Risk Free Rate": "value_intrinsic_value_risk_free_rate",
-            "Tax Rate": "value_intrinsic_value_tax_rate",
-            "Two Stage FCF CAGR 5Y": "value_intrinsic_value_two_stage_fcf_growth_cagr_5y",
-            "Two Stage FCF Shares Outstanding": "value_intrinsic_value_two_stage_fcf_shares_outstanding",
-            "Equity Premium": "value_intrinsic_value_equity_premium",
-            "EV to EBITDA": "value_ev_to_ebitda",
-            "EV to Sales": "value_ev_to_sales",
-            "Excess Return": "value_intrinsic_value_excess_returns_excess_return",
-            "Excess Returns Book Value": "value_intrinsic_value_excess_returns_book_value",
-            "Excess Returns Equity Cost": "value_intrinsic_value_excess_returns_equity_cost",
-            "Excess Returns ROE Average": "value_intrinsic_value_excess_returns_return_on_equity_avg",
-            "Excess Returns Stable Book Value": "value_intrinsic_value_excess_returns_stable_book_value",
-            "Excess Returns Stable EPS": "value_intrinsic_value_excess_returns_stable_eps",
-            "Terminal Value": "value_intrinsic_value_terminal_value",
-        }
-
-        # -----------------------------------------
-        # ALPHABETIZE ALL METRICS TOGETHER
-        # -----------------------------------------
-        sorted_items = dict(sorted(all_items.items(), key=lambda x: x[0]))
-
-        # -----------------------------------------
-        # SPLIT INTO LEFT / RIGHT COLUMNS EVENLY
-        # -----------------------------------------
-        labels = list(sorted_items.keys())
-        midpoint = len(labels) // 2
-
-        left_keys = labels[:midpoint]
-        right_keys = labels[midpoint:]
+        value_stats = stat_display_values(facts_row, sw_facts_df.dtypes, list(VALUE_STATS.values()))
 
         # -----------------------------------------
         # RENDER LEFT COLUMN
         # -----------------------------------------
         with col_left_vs:
-            for label in left_keys:
-                col = sorted_items[label]
-                st.markdown(
-                    f"""
-                    <div style='margin-bottom:12px;'>
-                        <span style='font-size:20px; font-weight:bold;'>{label}:</span>
-                        <span style='font-size:24px; font-weight:bold;'> {get_val(col)}</span>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+            st.markdown(
+                "".join(
+                    f"<div style='margin-bottom:12px;'>"
+                    f"<span style='font-size:20px; font-weight:bold;'>{label}:</span>"
+                    f"<span style='font-size:24px; font-weight:bold;'> {value_stats[VALUE_STATS[label]]}</span>"
+                    f"</div>"
+                    for label in VALUE_STATS_LEFT
+                ),
+                unsafe_allow_html=True
+            )
 
         # -----------------------------------------
         # RENDER RIGHT COLUMN
         # -----------------------------------------
         with col_right_vs:
-            for label in right_keys:
-                col = sorted_items[label]
-                st.markdown(
-                    f"""
-                    <div style='margin-bottom:12px;'>
-                        <span style='font-size:20px; font-weight:bold;'>{label}:</span>
-                        <span style='font-size:24px; font-weight:bold;'> {get_val(col)}</span>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+            st.markdown(
+                "".join(
+                    f"<div style='margin-bottom:12px;'>"
+                    f"<span style='font-size:20px; font-weight:bold;'>{label}:</span>"
+                    f"<span style='font-size:24px; font-weight:bold;'> {value_stats[VALUE_STATS[label]]}</span>"
+                    f"</div>"
+                    for label in VALUE_STATS_RIGHT
+                ),
+                unsafe_allow_html=True
+            )
 
     # ------------------------------
     # 🔹 SECTION 5 — VALUE FORECASTS
     # ------------------------------
     with st.expander("Value Forecasts", expanded=False):
 
-        # Define colors
-        ICE_BLUE = "#7FDBFF"
-        DARK_ICE_BLUE = "#3399CC"
-
-        # Years and corresponding columns
-        years = [2026, 2027, 2028, 2029, 2030, 2031, 2032, 2033, 2034, 2035]
-        forecast_cols = [
-            "value_intrinsic_value_two_stage_fcf_first_stage_2026_data",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2027_data",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2028_data",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2029_data",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2030_data",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2031_data",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2032_data",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2033_data",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2034_data",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2035_data"
-        ]
-        discounted_cols = [
-            "value_intrinsic_value_two_stage_fcf_first_stage_2026_discounted",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2027_discounted",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2028_discounted",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2029_discounted",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2030_discounted",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2031_discounted",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2032_discounted",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2033_discounted",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2034_discounted",
-            "value_intrinsic_value_two_stage_fcf_first_stage_2035_discounted"
-        ]
-
         # Extract values dynamically based on selected ticker and round to nearest tenth
-        forecast_values = [
-            round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, col].iloc[0], 1) 
-            for col in forecast_cols
-        ]
-        discounted_values = [
-            round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, col].iloc[0], 1) 
-            for col in discounted_cols
-        ]
+        forecast_values = facts_row[VALUE_FORECAST_COLS].astype(float).round(1).to_numpy()
+        discounted_values = facts_row[VALUE_DISCOUNTED_COLS].astype(float).round(1).to_numpy()
 
         # Create bar chart
         fig_forecast = go.Figure()
 
         fig_forecast.add_trace(go.Bar(
-            x=[str(year) for year in years],
+            x=VALUE_FORECAST_YEAR_LABELS,
             y=forecast_values,
             name="Free Cash Flow Forecast",
             marker_color=ICE_BLUE,
-            text=[f"{v:,}" for v in forecast_values],
+            texttemplate="%{y:,.1f}",
             textposition="auto",
             textfont=dict(size=16, color="black")
         ))
 
         fig_forecast.add_trace(go.Bar(
-            x=[str(year) for year in years],
+            x=VALUE_FORECAST_YEAR_LABELS,
             y=discounted_values,
             name="Discounted Value",
             marker_color=DARK_ICE_BLUE,
-            text=[f"{v:,}" for v in discounted_values],
+            texttemplate="%{y:,.1f}",
             textposition="auto",
             textfont=dict(size=16, color="black")
         ))
@@ -1191,9 +2170,7 @@ with st.expander("Value", expanded=False):
             xaxis=dict(title="Year"),
             yaxis=dict(title="Value (in Millions)"),
             barmode='group',
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font_color='black',
+            **BASE_FIG_LAYOUT,
             height=500,
             margin=dict(l=40, r=40, t=80, b=40),
             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
@@ -1212,19 +2189,12 @@ with st.expander("Health", expanded=False):
     # ------------------------------
     with st.expander("Health Comparisons", expanded=False):
 
-        # ------------------------------
-        # Define colors (same as Value Comparisons)
-        # ------------------------------
-        ICE_BLUE = "#7FDBFF"
-        GRAY = "#888888"
-        BLACK = "#000000"
-
         # ------------------------------
         # Extract values dynamically for selected ticker
         # ------------------------------
-        company_val = sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_scores_health"].iloc[0]
-        industry_val = sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_health_score"].iloc[0]
-        all_val = sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_health_score"].iloc[0]
+        company_val = facts["extended_data_scores_health"]
+        industry_val = facts["extended_data_industry_averages_health_score"]
+        all_val = facts["extended_data_industry_averages_all_health_score"]
 
         # ------------------------------
         # Create bar chart
@@ -1268,9 +2238,7 @@ with st.expander("Health", expanded=False):
             title=dict(text="Health Score Comparison", x=0.5, xanchor="center", font=dict(size=22, color="black")),
             xaxis=dict(showgrid=False),
             yaxis=dict(showgrid=False),
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-            font_color="black",
+            **BASE_FIG_LAYOUT,
             showlegend=False,
             height=350,
             margin=dict(l=20, r=20, t=60, b=20)
@@ -1289,363 +2257,42 @@ with st.expander("Health", expanded=False):
             </div>
         """, unsafe_allow_html=True)
 
-    with st.expander("Health Statistics", expanded=False):
-
-        # ------------------------------
-        # Define columns
-        # ------------------------------
-        health_columns = [
-            "health_accounts_payable",
-            "health_accounts_receivable_percent",
-            "health_accounts_receivable_growth_1y",
-            "health_aggregate_accruals",
-            "health_capex",
-            "health_capex_growth_1y",
-            "health_capex_growth_annual",
-            "health_cash_from_investing",
-            "health_cash_from_investing_1y",
-            "health_cash_operating",
-            "health_cash_operating_growth_1y",
-            "health_current_assets",
-            "health_current_assets_to_long_term_liab",
-            "health_current_assets_to_total_debt",
-            "health_current_portion_lease_liabilities",
-            "health_current_solvency_ratio",
-            "health_debt_to_equity_ratio",
-            "health_debt_to_equity_ratio_past",
-            "health_fixed_to_total_assets",
-            "health_inventory",
-            "health_inventory_growth_1y",
-            "health_last_balance_sheet_update",
-            "health_levered_free_cash_flow_break_even_years",
-            "health_levered_free_cash_flow_growth_annual",
-            "health_levered_free_cash_flow_growth_years",
-            "health_levered_free_cash_flow_stable_years",
-            "health_long_term_assets",
-            "health_long_term_debt",
-            "health_long_term_liab",
-            "health_long_term_portion_lease_liabilities",
-            "health_management_rate_return",
-            "health_median_2yr_net_income",
-            "health_net_debt",
-            "health_net_debt_to_ebitda",
-            "health_net_debt_to_equity",
-            "health_net_income",
-            "health_net_interest_cover",
-            "health_net_interest_expense",
-            "health_net_operating_assets",
-            "health_net_operating_assets_1y",
-            "health_operating_cash_flow_to_total_debt",
-            "health_operating_expenses",
-            "health_operating_expenses_growth_annual",
-            "health_operating_expenses_growth_years",
-            "health_operating_expenses_stable_years",
-            "health_ppe",
-            "health_receivables",
-            "health_restricted_cash",
-            "health_restricted_cash_ratio",
-            "health_total_assets",
-            "health_total_debt",
-            "health_total_equity",
-            "health_total_inventory",
-            "health_total_liab_equity",
-            "health_total_lease_liabilities",
-            "health_total_debt_equity",
-        ]
-
-        # Include industry analysis metrics
-        industry_columns = [
-            "health_industry_analysis_net_int_margin",
-            "health_industry_analysis_net_loans",
-            "health_industry_analysis_net_loans_to_deposits",
-            "health_industry_analysis_net_loans_to_total_assets",
-            "health_industry_analysis_non_perf_loans_total_loans",
-            "health_industry_analysis_loan_losses",
-            "health_industry_analysis_allowance_loan_losses",
-            "health_industry_analysis_allowance_non_perf_loans",
-            "health_industry_analysis_total_bank_liabilities",
-            "health_industry_analysis_total_deposits",
-            "health_capitalisation_percent",
-            "health_capitalisation_percent_1y",
-            "health_book_value_per_share",
-        ]
-
-        # Combine all metrics
-        all_metrics = health_columns + industry_columns
-
-        # Sort alphabetically by display name (remove 'health_' and 'industry_analysis_' prefix for sorting)
-        all_metrics_sorted = sorted(all_metrics, key=lambda x: x.replace("health_", "").replace("industry_analysis_", "").lower())
-
-        # Split into left and right columns (approx equal)
-        midpoint = len(all_metrics_sorted) // 2
-        left_metrics = all_metrics_sorted[:midpoint]
-        right_metrics = all_metrics_sorted[midpoint:]
-
-        # ------------------------------
-        # Create columns
-        # ------------------------------
-        col_left, col_right = st.columns(2)
-
-        # ------------------------------
-        # LEFT COLUMN
-        # ------------------------------
-        with col_left:
-            for col in left_metrics:
-                value = sw_facts_df.loc[
-                    sw_facts_df["source_file"] == selected_ticker, col
-                ].iloc[0]
-
-                display_name = (
-                    col.replace("health_", "")
-                    .replace("industry_analysis_", "")
-                    .replace("_", " ")
-                    .title()
-                )
-
-                if pd.notna(value) and isinstance(value, (int, float)):
-                    value_display = round(value, 3)
-                else:
-                    value_display = "N/A"
-
-                st.markdown(
-                    f"""
-                    <div style='margin-bottom:12px;'>
-                        <span style='font-size:20px;'>{display_name}:</span>
-                        <span style='font-size:24px; font-weight:bold;'> {value_display}</span>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-
-        # ------------------------------
-        # RIGHT COLUMN
-        # ------------------------------
-        with col_right:
-            for col in right_metrics:
-                value = sw_facts_df.loc[
-                    sw_facts_df["source_file"] == selected_ticker, col
-                ].iloc[0]
-
-                display_name = (
-                    col.replace("health_", "")
-                    .replace("industry_analysis_", "")
-                    .replace("_", " ")
-                    .title()
-                )
-
-                if pd.notna(value) and isinstance(value, (int, float)):
-                    value_display = round(value, 3)
-                else:
-                    value_display = "N/A"
-
-                st.markdown(
-                    f"""
-                    <div style='margin-bottom:12px;'>
-                        <span style='font-size:20px;'>{display_name}:</span>
-                        <span style='font-size:24px; font-weight:bold;'> {value_display}</span>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-
-    # ------------------------------
-    # 🔹 SECTION 7 — HEALTH HISTORY
-    # ------------------------------
-    with st.expander("Health History", expanded=False):
-
-        # Define colors
-        ICE_BLUE = "#7FDBFF"
-
-        # ------------------------------
-        # Graph 1: Net Operating Assets History
-        # ------------------------------
-        noa_cols = [
-            "health_net_operating_assets_ltm_history_0",
-            "health_net_operating_assets_ltm_history_1",
-            "health_net_operating_assets_ltm_history_2",
-            "health_net_operating_assets_ltm_history_3"
-        ]
-        noa_values = [
-            round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, col].iloc[0], 1)
-            for col in noa_cols
-        ]
-        noa_years = [f"Year {i}" for i in range(len(noa_cols))]
-
-        fig_noa = go.Figure()
-        fig_noa.add_trace(go.Bar(
-            x=noa_years,
-            y=noa_values,
-            marker_color=ICE_BLUE,
-            text=[f"{v:,}" for v in noa_values],
-            textposition="auto",
-            textfont=dict(size=16, color="black")
-        ))
-        fig_noa.update_layout(
-            title=dict(text="Net Operating Assets History By Year", x=0.5, xanchor="center", font=dict(size=22)),
-            xaxis=dict(title="Year"),
-            yaxis=dict(title="Value"),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font_color='black',
-            height=400,
-            margin=dict(l=40, r=40, t=80, b=40)
-        )
-        st.plotly_chart(fig_noa, use_container_width=True)
-
-        st.markdown("<div style='height:20px;'></div>", unsafe_allow_html=True)
-
-        # ------------------------------
-        # Graph 2: Aggregate Accruals History
-        # ------------------------------
-        accrual_cols = [
-            "health_aggregate_accruals_ltm_history_0",
-            "health_aggregate_accruals_ltm_history_1",
-            "health_aggregate_accruals_ltm_history_2",
-            "health_aggregate_accruals_ltm_history_3"
-        ]
-        accrual_values = [
-            round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, col].iloc[0], 1)
-            for col in accrual_cols
-        ]
-        accrual_years = [f"Year {i}" for i in range(len(accrual_cols))]
-
-        fig_accrual = go.Figure()
-        fig_accrual.add_trace(go.Bar(
-            x=accrual_years,
-            y=accrual_values,
-            marker_color=ICE_BLUE,
-            text=[f"{v:,}" for v in accrual_values],
-            textposition="auto",
-            textfont=dict(size=16, color="black")
-        ))
-        fig_accrual.update_layout(
-            title=dict(text="Aggregate Accruals History By Year", x=0.5, xanchor="center", font=dict(size=22)),
-            xaxis=dict(title="Year"),
-            yaxis=dict(title="Value"),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font_color='black',
-            height=400,
-            margin=dict(l=40, r=40, t=80, b=40)
-        )
-        st.plotly_chart(fig_accrual, use_container_width=True)
-
-        st.markdown("<div style='height:20px;'></div>", unsafe_allow_html=True)
-
-        # ------------------------------
-        # Graph 3: Accrual Ratio From Cashflow History
-        # ------------------------------
-        accrual_ratio_cols = [
-            "health_accrual_ratio_from_cashflow_ltm_history_0",
-            "health_accrual_ratio_from_cashflow_ltm_history_1",
-            "health_accrual_ratio_from_cashflow_ltm_history_2"
-        ]
-        accrual_ratio_values = [
-            round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, col].iloc[0], 1)
-            for col in accrual_ratio_cols
-        ]
-        accrual_ratio_years = [f"Year {i}" for i in range(len(accrual_ratio_cols))]
-
-        fig_accrual_ratio = go.Figure()
-        fig_accrual_ratio.add_trace(go.Bar(
-            x=accrual_ratio_years,
-            y=accrual_ratio_values,
-            marker_color=ICE_BLUE,
-            text=[f"{v:,}" for v in accrual_ratio_values],
-            textposition="auto",
-            textfont=dict(size=16, color="black")
-        ))
-        fig_accrual_ratio.update_layout(
-            title=dict(text="Accrual Ratio From Cashflow History By Year", x=0.5, xanchor="center", font=dict(size=22)),
-            xaxis=dict(title="Year"),
-            yaxis=dict(title="Value"),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font_color='black',
-            height=400,
-            margin=dict(l=40, r=40, t=80, b=40)
-        )
-        st.plotly_chart(fig_accrual_ratio, use_container_width=True)
-
-        st.markdown("<div style='height:20px;'></div>", unsafe_allow_html=True)
-
-        # ------------------------------
-        # Graph 4: Total Assets History
-        # ------------------------------
-        total_assets_cols = [
-            "health_total_assets_ltm_history_0",
-            "health_total_assets_ltm_history_1",
-            "health_total_assets_ltm_history_2",
-            "health_total_assets_ltm_history_3",
-            "health_total_assets_ltm_history_4",
-            "health_total_assets_ltm_history_5"
-        ]
-        total_assets_values = [
-            round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, col].iloc[0], 1)
-            for col in total_assets_cols
-        ]
-        total_assets_years = [f"Year {i}" for i in range(len(total_assets_cols))]
-
-        fig_total_assets = go.Figure()
-        fig_total_assets.add_trace(go.Bar(
-            x=total_assets_years,
-            y=total_assets_values,
-            marker_color=ICE_BLUE,
-            text=[f"{v:,}" for v in total_assets_values],
-            textposition="auto",
-            textfont=dict(size=16, color="black")
-        ))
-        fig_total_assets.update_layout(
-            title=dict(text="Total Assets History By Year", x=0.5, xanchor="center", font=dict(size=22)),
-            xaxis=dict(title="Year"),
-            yaxis=dict(title="Value"),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font_color='black',
-            height=400,
-            margin=dict(l=40, r=40, t=80, b=40)
-        )
-        st.plotly_chart(fig_total_assets, use_container_width=True)
-
-        st.markdown("<div style='height:20px;'></div>", unsafe_allow_html=True)
+    with st.expander("Health Statistics", expanded=False):
+
+        all_metrics_sorted = list(HEALTH_STATS_SORTED)
 
         # ------------------------------
-        # Graph 5: Total Current Liabilities History
+        # Format every metric in one vectorized pass
         # ------------------------------
-        total_current_liab_cols = [
-            "health_total_current_liab_ltm_history_0",
-            "health_total_current_liab_ltm_history_1",
-            "health_total_current_liab_ltm_history_2",
-            "health_total_current_liab_ltm_history_3",
-            "health_total_current_liab_ltm_history_4",
-            "health_total_current_liab_ltm_history_5"
-        ]
-        total_current_liab_values = [
-            round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, col].iloc[0], 1)
-            for col in total_current_liab_cols
-        ]
-        total_current_liab_years = [f"Year {i}" for i in range(len(total_current_liab_cols))]
-
-        fig_total_current_liab = go.Figure()
-        fig_total_current_liab.add_trace(go.Bar(
-            x=total_current_liab_years,
-            y=total_current_liab_values,
-            marker_color=ICE_BLUE,
-            text=[f"{v:,}" for v in total_current_liab_values],
-            textposition="auto",
-            textfont=dict(size=16, color="black")
-        ))
-        fig_total_current_liab.update_layout(
-            title=dict(text="Total Current Liabilities History By Year", x=0.5, xanchor="center", font=dict(size=22)),
-            xaxis=dict(title="Year"),
-            yaxis=dict(title="Value"),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font_color='black',
-            height=400,
-            margin=dict(l=40, r=40, t=80, b=40)
+        health_numeric = [c for c in all_metrics_sorted if c not in SW_STR_COLS]
+        health_vals = (
+            pd.to_numeric(facts_row.reindex(health_numeric), errors="coerce")
+            .round(3)
+            .reindex(all_metrics_sorted)
         )
-        st.plotly_chart(fig_total_current_liab, use_container_width=True)
+
+        # ------------------------------
+        # One table instead of a styled div per metric
+        # ------------------------------
+        health_table = pd.DataFrame({
+            "Metric": [DISPLAY_NAMES[col] for col in all_metrics_sorted],
+            "Value": health_vals.astype(str).where(health_vals.notna(), "N/A").to_numpy(),
+        })
+        st.dataframe(health_table, hide_index=True, use_container_width=True, height=600)
+
+    # ------------------------------
+    # 🔹 SECTION 7 — HEALTH HISTORY
+    # ------------------------------
+    with st.expander("Health History", expanded=False):
+
+        # Every graph's history in one slice, then split back by each graph's column count
+        history_all = np.round(facts_row[HISTORY_COLS].to_numpy(dtype=float), 1)
+
+        # Keyed container: the page CSS spaces its charts, so no spacer elements are sent
+        with st.container(key="health-history"):
+            for (title, cols), end in zip(HISTORY_GRAPHS, HISTORY_ENDS):
+                values = tuple(history_all[end - len(cols):end])
+                st.plotly_chart(build_history_bar_chart(values, title), use_container_width=True)
 
 # ------------------------------
 # 🔹 SECTION 8 — FUTURE
@@ -1657,64 +2304,32 @@ with st.expander("Future", expanded=False):
     # ------------------------------
     with st.expander("Future Comparisons", expanded=False):
 
-        # Define colors
-        ICE_BLUE = "#7FDBFF"
-        GRAY = "#888888"
-        BLACK = "#000000"
-
-        # ------------------------------
-        # Helper function for bar charts
-        # ------------------------------
-        def create_future_bar_chart(company_val, industry_val, all_val, title, company_label, industry_label, all_label):
-            fig = go.Figure(
-                data=[
-                    go.Bar(name=company_label, x=["Company"], y=[company_val], marker_color=ICE_BLUE,
-                           hoverinfo="skip", text=[f"<b>{company_val}</b>"], textposition="auto", textfont=dict(size=14)),
-                    go.Bar(name=industry_label, x=["Industry"], y=[industry_val], marker_color=GRAY,
-                           hoverinfo="skip", text=[f"<b>{industry_val}</b>"], textposition="auto", textfont=dict(size=14)),
-                    go.Bar(name=all_label, x=["All Companies"], y=[all_val], marker_color=BLACK,
-                           hoverinfo="skip", text=[f"<b>{all_val}</b>"], textposition="auto", textfont=dict(size=14)),
-                ]
-            )
-            fig.update_layout(
-                title=dict(text=title, x=0.5, xanchor="center", font=dict(size=22, color="black")),
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False),
-                plot_bgcolor="white",
-                paper_bgcolor="white",
-                font_color="black",
-                showlegend=False,
-                height=350,
-                margin=dict(l=20, r=20, t=60, b=20)
-            )
-            return fig
-
         # ------------------------------
         # Graph 1: Future Score Comparison
         # ------------------------------
         col1, col2 = st.columns(2)
 
-        future_score_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_scores_future"].iloc[0], 3)
-        future_score_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_future_performance_score"].iloc[0], 3)
-        future_score_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_future_performance_score"].iloc[0], 3)
+        future_score_company = round(facts["extended_data_scores_future"], 3)
+        future_score_industry = round(facts["extended_data_industry_averages_future_performance_score"], 3)
+        future_score_all = round(facts["extended_data_industry_averages_all_future_performance_score"], 3)
 
         with col1:
-            st.plotly_chart(create_future_bar_chart(future_score_company, future_score_industry, future_score_all,
-                                                    "Future Score Comparison",
-                                                    "Company Score", "Industry Avg Score", "All Company Avg Score"),
+            st.plotly_chart(create_bar_chart(future_score_company, future_score_industry, future_score_all,
+                                             "Future Score Comparison",
+                                             "Company Score", "Industry Avg Score", "All Company Avg Score"),
                             use_container_width=True)
 
         # ------------------------------
         # Graph 2: Future 1 Year Growth Comparison
         # ------------------------------
-        growth_1y_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "future_growth_1y"].iloc[0], 3)
-        growth_1y_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_future_one_year_growth"].iloc[0], 3)
-        growth_1y_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_future_one_year_growth"].iloc[0], 3)
+        growth_1y_company = round(facts["future_growth_1y"], 3)
+        growth_1y_industry = round(facts["extended_data_industry_averages_future_one_year_growth"], 3)
+        growth_1y_all = round(facts["extended_data_industry_averages_all_future_one_year_growth"], 3)
 
         with col2:
-            st.plotly_chart(create_future_bar_chart(growth_1y_company, growth_1y_industry, growth_1y_all,
-                                                    "Future 1 Year Growth Comparisons",
-                                                    "Company 1Y Growth", "Industry Avg 1Y Growth", "All Company Avg 1Y Growth"),
+            st.plotly_chart(create_bar_chart(growth_1y_company, growth_1y_industry, growth_1y_all,
+                                             "Future 1 Year Growth Comparisons",
+                                             "Company 1Y Growth", "Industry Avg 1Y Growth", "All Company Avg 1Y Growth"),
                             use_container_width=True)
 
         st.markdown("<div style='height:50px;'></div>", unsafe_allow_html=True)
@@ -1722,68 +2337,29 @@ with st.expander("Future", expanded=False):
         # ------------------------------
         # Graph 3: Future 3 Year Growth Comparison (full width)
         # ------------------------------
-        growth_3y_company = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "future_growth_3y"].iloc[0], 3)
-        growth_3y_industry = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_future_three_year_growth"].iloc[0], 3)
-        growth_3y_all = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_future_three_year_growth"].iloc[0], 3)
+        growth_3y_company = round(facts["future_growth_3y"], 3)
+        growth_3y_industry = round(facts["extended_data_industry_averages_future_three_year_growth"], 3)
+        growth_3y_all = round(facts["extended_data_industry_averages_all_future_three_year_growth"], 3)
 
-        st.plotly_chart(create_future_bar_chart(growth_3y_company, growth_3y_industry, growth_3y_all,
-                                                "Future 3 Year Growth Comparisons",
-                                                "Company 3Y Growth", "Industry Avg 3Y Growth", "All Company Avg 3Y Growth"),
+        st.plotly_chart(create_bar_chart(growth_3y_company, growth_3y_industry, growth_3y_all,
+                                         "Future 3 Year Growth Comparisons",
+                                         "Company 3Y Growth", "Industry Avg 3Y Growth", "All Company Avg 3Y Growth"),
                         use_container_width=True)
     # ------------------------------
     # 🔹 SECTION 9 — FUTURE STATISTICS
     # ------------------------------
     with st.expander("Future Statistics", expanded=False):
 
-        # ------------------------------
-        # Columns for left and right
-        # ------------------------------
-        future_stats_cols = [
-            "future_roe_1y",
-            "future_roe_3y",
-            "future_return_on_equity_1y",
-            "future_return_on_equity_3y",
-            "future_earnings_per_share_growth_1y",
-            "future_earnings_per_share_growth_3y",
-            "future_minimum_earnings_growth",
-            "future_earnings_per_share_growth_annual",
-            "future_revenue_growth_annual",
-            "future_cash_ops_growth_annual",
-            "future_net_income_growth_annual",
-            "future_ebitda_1y",
-            "future_ebitda_growth_1y",
-            "future_forward_pe_1y",
-            "future_forward_price_to_sales_1y",
-            "future_forward_ev_to_ebitda_1y",
-            "future_forward_ev_to_sales_1y",
-            "future_gross_profit_margin_1y"
-        ]
-
         # ------------------------------
         # Extract values dynamically
         # ------------------------------
         stats_data = []
-        for col in future_stats_cols:
-            value = sw_facts_df.loc[
-                sw_facts_df["source_file"] == selected_ticker, col
-            ].iloc[0]
+        for col in FUTURE_STATS_SORTED:
+            value = facts[col]
 
             rounded_value = round(value, 3) if pd.notna(value) else "N/A"
 
-            # Create display name:
-            # Remove "future" ONLY if followed by "forward"
-            parts = col.split("_")
-            if len(parts) > 1 and parts[1] == "forward":
-                display_name = " ".join(parts[1:]).title()
-            else:
-                display_name = " ".join(parts).title()
-
-            stats_data.append((display_name, rounded_value))
-
-        # ------------------------------
-        # Alphabetize
-        # ------------------------------
-        stats_data = sorted(stats_data, key=lambda x: x[0])
+            stats_data.append((DISPLAY_NAMES[col], rounded_value))
 
         # ------------------------------
         # Split into left and right columns
@@ -1797,126 +2373,39 @@ with st.expander("Future", expanded=False):
         # ------------------------------
         col_left, col_right = st.columns(2)
 
-        # Formatting function
-        def render_stat(name, val):
-            st.markdown(
-                f"""
-                <div style='margin-bottom:12px;'>
-                    <span style='font-size:20px;'>{name}:</span>
-                    <span style='font-size:24px; font-weight:bold;'> {val}</span>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-
         # ------------------------------
         # Left Column
         # ------------------------------
         with col_left:
-            for name, val in left_stats:
-                render_stat(name, val)
+            st.markdown(stat_rows_html(left_stats), unsafe_allow_html=True)
 
         # ------------------------------
         # Right Column
         # ------------------------------
         with col_right:
-            for name, val in right_stats:
-                render_stat(name, val)
+            st.markdown(stat_rows_html(right_stats), unsafe_allow_html=True)
 
     # ------------------------------
     # 🔹 SECTION 10 — FUTURE FORECASTS
     # ------------------------------
     with st.expander("Future Forecasts", expanded=False):
 
-        ICE_BLUE = "#7FDBFF"
-
-        # Helper function for bar graphs with proper spacing
-        def create_forecast_bar_graph(columns, title):
-            years_labels = ["1 Year", "2 Year", "3 Year"]  # x-axis labels
-            fig = go.Figure()
-
-            # Add each bar trace
-            for i, col in enumerate(columns):
-                value = round(sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, col].iloc[0], 1)
-                fig.add_trace(go.Bar(
-                    x=[years_labels[i]],
-                    y=[value],
-                    name=years_labels[i],
-                    marker_color=ICE_BLUE,
-                    text=[f"{value:,}"],
-                    textposition="auto",
-                    textfont=dict(size=16, color="black"),
-                    width=0.4  # reduces bar width for more spacing
-                ))
-
-            # Layout
-            fig.update_layout(
-                title=dict(text=title, x=0.5, xanchor="center", font=dict(size=22)),
-                xaxis=dict(title="Forecast Horizon", tickmode="array", tickvals=years_labels, ticktext=years_labels),
-                yaxis=dict(title="Value"),
-                barmode='group',
-                bargap=0.6,  # adds spacing between groups
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font_color='black',
-                height=400,
-                margin=dict(l=40, r=40, t=60, b=40),
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Graphs with spacing and labels
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-        create_forecast_bar_graph(
-            ["future_earnings_per_share_1y", "future_earnings_per_share_2y", "future_earnings_per_share_3y"],
-            "Forecasted Earnings Per Share"
-        )
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-        create_forecast_bar_graph(
-            ["future_revenue_growth_1y", "future_revenue_growth_2y", "future_revenue_growth_3y"],
-            "Forecasted Revenue Growth"
-        )
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-        create_forecast_bar_graph(
-            ["future_revenue_1y", "future_revenue_2y", "future_revenue_3y"],
-            "Forecasted Revenue"
-        )
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-        create_forecast_bar_graph(
-            ["future_cash_ops_growth_1y", "future_cash_ops_growth_2y", "future_cash_ops_growth_3y"],
-            "Forecasted Cash Ops Growth"
-        )
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-        create_forecast_bar_graph(
-            ["future_cash_ops_1y", "future_cash_ops_2y", "future_cash_ops_3y"],
-            "Forecasted Cash Ops"
-        )
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-        create_forecast_bar_graph(
-            ["future_net_income_growth_1y", "future_net_income_growth_2y", "future_net_income_growth_3y"],
-            "Forecasted Net Income Growth"
-        )
+        # All 21 values in one slice, one row of three horizons per graph
+        forecast_values = np.round(facts_row[FORECAST_COLS].to_numpy(dtype=float), 1).reshape(len(FORECAST_GRAPHS), 3)
 
         st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-        create_forecast_bar_graph(
-            ["future_net_income_1y", "future_net_income_2y", "future_net_income_3y"],
-            "Forecasted Net Income"
+        st.plotly_chart(
+            build_forecast_grid_chart(
+                tuple(map(tuple, forecast_values)),
+                FORECAST_TITLES,
+            ),
+            use_container_width=True
         )
 
 with st.expander("Past"):
     
     with st.expander("Past Comparisons"):
 
-        # Use the same color palette as the rest of the app
-        ICE_BLUE = "#7FDBFF"
-        GRAY = "#888888"
-        BLACK = "#000000"
-
         # Reusable bar chart function (consistent with Value Comparisons style)
         def comparison_bar_chart(title, categories, values, colors):
             fig = go.Figure()
@@ -1937,8 +2426,7 @@ with st.expander("Past"):
                 margin=dict(l=10, r=10, t=50, b=30),
                 xaxis=dict(title="", tickfont=dict(size=12)),
                 yaxis=dict(title="Value", gridcolor="rgba(0,0,0,0.05)"),
-                plot_bgcolor="white",
-                paper_bgcolor="white",
+                **BASE_FIG_LAYOUT,
                 showlegend=False,
                 height=320
             )
@@ -1954,9 +2442,9 @@ with st.expander("Past"):
         with col1:
             categories = ["Company", "Industry Avg", "All Companies Avg"]
             values = [
-                sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_scores_past"].iloc[0],
-                sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_past_performance_score"].iloc[0],
-                sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_past_performance_score"].iloc[0],
+                facts["extended_data_scores_past"],
+                facts["extended_data_industry_averages_past_performance_score"],
+                facts["extended_data_industry_averages_all_past_performance_score"],
             ]
             colors = [ICE_BLUE, GRAY, BLACK]
 
@@ -1968,9 +2456,9 @@ with st.expander("Past"):
         with col2:
             categories = ["Company", "Industry Avg", "All Companies Avg"]
             values = [
-                sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "past_growth_1y"].iloc[0],
-                sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_past_one_year_growth"].iloc[0],
-                sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_past_one_year_growth"].iloc[0],
+                facts["past_growth_1y"],
+                facts["extended_data_industry_averages_past_one_year_growth"],
+                facts["extended_data_industry_averages_all_past_one_year_growth"],
             ]
             colors = [ICE_BLUE, GRAY, BLACK]
 
@@ -1984,9 +2472,9 @@ with st.expander("Past"):
         # ---------------------------
         categories = ["Company", "Industry Avg", "All Companies Avg"]
         values = [
-            sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "past_growth_5y"].iloc[0],
-            sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_past_five_year_growth"].iloc[0],
-            sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_past_five_year_growth"].iloc[0],
+            facts["past_growth_5y"],
+            facts["extended_data_industry_averages_past_five_year_growth"],
+            facts["extended_data_industry_averages_all_past_five_year_growth"],
         ]
         colors = [ICE_BLUE, GRAY, BLACK]
 
@@ -1998,279 +2486,60 @@ with st.expander("Past"):
 
     with st.expander("Past Statistics"):
 
-        past_columns = [
-            "past_revenue_usd",
-            "past_operating_revenue",
-            "past_net_income_usd",
-            "past_earnings_per_share",
-            "past_earnings_per_share_5y_avg",
-            "past_ebt_excluding",
-            "past_earnings_continued_ops",
-            "past_total_assets",
-            "past_total_equity",
-            "past_current_liabilities",
-            "past_return_on_equity",
-            "past_return_on_assets",
-            "past_return_on_capital_employed",
-            "past_return_on_capital_employed_past",
-            "past_return_on_capital_growth",
-            "past_net_income_5y_avg",
-            "past_last_earnings_update",
-            "past_last_earnings_update_annual",
-            "past_industry_analysis_d_a_expense",
-            "past_industry_analysis_r_d_expense",
-            "past_industry_analysis_non_op_expense",
-            "past_industry_analysis_sales_marketing",
-            "past_industry_analysis_revenue_segments_banking",
-            "past_industry_analysis_stock_based_comp",
-            "past_industry_analysis_general_administrative",
-            "past_industry_analysis_selling_general_admin_expenses",
-            "past_ebit",
-            "past_ebit_3y_avg",
-            "past_ebit_5y_avg",
-            "past_earnings_per_share_single_growth_3y",
-            "past_earnings_per_share_single_growth_5y",
-            "past_gross_profit_margin_1y",
-            "past_net_income_margin",
-            "past_net_income_margin_1y",
-            "past_change_in_unearned_revenue",
-            "past_unearned_revenue_percent_of_sales",
-            "past_ebt_including",
-            "past_unusual_items",
-            "past_unusual_item_ratio",
-            "past_operating_revenue_percent",
-            "past_years_profitable",
-            "past_trading_since_years",
-            "past_non_operating_revenue",
-            "past_non_operating_revenue_ratio",
-            "past_non_operating_revenue_ratio_delta",
-            "past_income_tax_to_ebit_ratio",
-            "past_business_revenue_segments_banking",
-            "past_selling_general_admin_expense",
-            "past_research_development_expense",
-            "past_sales_marketing_expense",
-            "past_stock_based_compensation",
-            "past_depreciation_amortization",
-            "past_general_admin_expense",
-            "past_non_operating_expense",
-            "past_last_processed_filing_date",
-            "past_last_company_filing_date",
-            "past_last_announced_date",
-        ]
-
-        # Process display names
-        display_pairs = []
-        for col in past_columns:
-
-            # DISPLAY NAME ONLY — leave actual col intact
-            display = col.replace("past_", "")
-            display = display.replace("_", " ")
-            display = display.replace("industry analysis ", "")
-            display = display.replace("revenue segments ", "")
-            display = display.title()
-
-            display_pairs.append((display, col))
-
-        # Alphabetize
-        display_pairs = sorted(display_pairs, key=lambda x: x[0])
-
-        # Split into left/right columns
-        mid = len(display_pairs) // 2
-        left_items = display_pairs[:mid]
-        right_items = display_pairs[mid:]
+        # Split the precomputed, alphabetized labels into left/right columns, one st.markdown each
+        mid = len(PAST_STATS_ITEMS) // 2
+        left_items = PAST_STATS_ITEMS[:mid]
+        right_items = PAST_STATS_ITEMS[mid:]
 
         left, right = st.columns(2)
 
         # Left column
         with left:
-            for display, col in left_items:
-                value = sw_facts_df[col].iloc[0]
-                st.markdown(
-                    f"""
-                    <div style='padding:6px 0;'>
-                        <span style='font-size:20px;'>{display}:</span>
-                        <span style='font-size:24px; font-weight:bold;'>{value}</span>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
+            st.markdown(
+                "".join(
+                    f"<div style='padding:6px 0;'>"
+                    f"<span style='font-size:20px;'>{display}:</span> "
+                    f"<span style='font-size:24px; font-weight:bold;'>{facts.get(col, 'N/A')}</span>"
+                    f"</div>"
+                    for display, col in left_items
+                ),
+                unsafe_allow_html=True,
+            )
 
         # Right column
         with right:
-            for display, col in right_items:
-                value = sw_facts_df[col].iloc[0]
-                st.markdown(
-                    f"""
-                    <div style='padding:6px 0;'>
-                        <span style='font-size:20px;'>{display}:</span>
-                        <span style='font-size:24px; font-weight:bold;'>{value}</span>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
+            st.markdown(
+                "".join(
+                    f"<div style='padding:6px 0;'>"
+                    f"<span style='font-size:20px;'>{display}:</span> "
+                    f"<span style='font-size:24px; font-weight:bold;'>{facts.get(col, 'N/A')}</span>"
+                    f"</div>"
+                    for display, col in right_items
+                ),
+                unsafe_allow_html=True,
+            )
 
     # ------------------------------
     # 📈 PAST → PAST HISTORY
     # ------------------------------
     with st.expander("Past History", expanded=False):
 
-        ICE_BLUE = "#7FDBFF"
-        ICE_BLUE_DARK = "#3399CC"
-        BG = "white"
-        TEXT_COLOR = "black"
-
-        def safe_fetch(col):
-            """Return (numeric_value_or_0, text_label) where text_label is 'N/A' if missing."""
-            try:
-                val = sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, col].iloc[0]
-                if pd.isna(val):
-                    return 0, "N/A"
-                try:
-                    num = float(val)
-                    return num, f"{num:,.3f}"
-                except:
-                    return 0, str(val)
-            except:
-                return 0, "N/A"
-
-        def create_history_chart(title, cols, labels=None, round_digits=3):
-            values = []
-            text_labels = []
-            for c in cols:
-                v, txt = safe_fetch(c)
-                if txt != "N/A" and txt.replace(",", "").replace(".", "", 1).lstrip("-").isdigit():
-                    try:
-                        val_num = float(txt.replace(",", ""))
-                        txt_fmt = f"{val_num:,.{round_digits}f}"
-                    except:
-                        txt_fmt = txt
-                    text_labels.append(txt_fmt)
-                else:
-                    text_labels.append(txt)
-                values.append(v)
-
-            if labels is None:
-                labels = [f"Year {i}" for i in range(len(cols))]
-
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=labels,
-                y=values,
-                marker_color=ICE_BLUE,
-                marker_line=dict(width=1, color="rgba(0,0,0,0.1)"),
-                text=text_labels,
-                textposition="auto",
-                textfont=dict(size=14, family="Arial", color=TEXT_COLOR),
-                hoverinfo="skip",
-                width=0.5
-            ))
-
-            fig.update_layout(
-                title=dict(text=title, x=0.5, xanchor="center", font=dict(size=20, color=TEXT_COLOR)),
-                xaxis=dict(title="", tickfont=dict(size=12, color=TEXT_COLOR)),
-                yaxis=dict(title="", tickfont=dict(size=12, color=TEXT_COLOR)),
-                plot_bgcolor=BG,
-                paper_bgcolor=BG,
-                font_color=TEXT_COLOR,
-                margin=dict(l=40, r=40, t=70, b=40),
-                height=420,
-                bargap=0.35,
-                bargroupgap=0.15
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
-
-        # 1) Revenue LTM History
-        create_history_chart("Revenue (LTM) History", [
-            f"past_revenue_ltm_history_{i}" for i in range(11)
-        ])
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 2) Net Income LTM History
-        create_history_chart("Net Income (LTM) History", [
-            f"past_net_income_ltm_history_{i}" for i in range(11)
-        ])
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 3) Earnings Per Share LTM History
-        create_history_chart("Earnings Per Share (LTM) History", [
-            f"past_earnings_per_share_ltm_history_{i}" for i in range(11)
-        ])
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 4) EPS Summary 1y/3y/5y
-        create_history_chart("Earnings Per Share (1Y/3Y/5Y)", [
-            "past_earnings_per_share_1y",
-            "past_earnings_per_share_3y",
-            "past_earnings_per_share_5y"
-        ], labels=["1 Year", "3 Year", "5 Year"])
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 5) EPS Growth 1y/3y/5y
-        create_history_chart("EPS Growth (1Y/3Y/5Y)", [
-            "past_earnings_per_share_growth_1y",
-            "past_earnings_per_share_growth_3y",
-            "past_earnings_per_share_growth_5y"
-        ], labels=["1 Year", "3 Year", "5 Year"])
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 6) Net Income 1-5y
-        create_history_chart("Net Income (1Y → 5Y)", [
-            f"past_net_income_{i}y" for i in range(1, 6)
-        ], labels=[f"{i} Year" for i in range(1, 6)])
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 7) Net Income Growth 1y/3y/5y
-        create_history_chart("Net Income Growth (1Y/3Y/5Y)", [
-            "past_net_income_growth_1y",
-            "past_net_income_growth_3y",
-            "past_net_income_growth_5y"
-        ], labels=["1 Year", "3 Year", "5 Year"])
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 8) Revenue Growth 1y/3y/5y
-        create_history_chart("Revenue Growth (1Y/3Y/5Y)", [
-            "past_revenue_growth_1y",
-            "past_revenue_growth_3y",
-            "past_revenue_growth_5y"
-        ], labels=["1 Year", "3 Year", "5 Year"])
+        # All series in one vectorized read; missing/non-numeric → 0 with an "N/A" label
+        raw = pd.to_numeric(facts_row.reindex(PAST_HISTORY_COLS), errors="coerce").to_numpy(dtype=float)
+        missing = np.isnan(raw)
+        history_all = np.where(missing, 0.0, raw)
+        text_all = np.full(raw.shape, "N/A", dtype=object)
+        text_all[~missing] = [f"{v:,.3f}" for v in raw[~missing]]
 
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 9) EBIT LTM History
-        create_history_chart("EBIT (LTM) History", [
-            f"past_ebit_ltm_history_{i}" for i in range(6)
-        ])
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 10) EBIT Single Growth 1y/3y/5y
-        create_history_chart("EBIT Growth (1Y/3Y/5Y)", [
-            "past_ebit_single_growth_1y",
-            "past_ebit_single_growth_3y",
-            "past_ebit_single_growth_5y"
-        ], labels=["1 Year", "3 Year", "5 Year"])
-
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 11) Capital Employed LTM History
-        create_history_chart("Capital Employed (LTM) History", [
-            f"past_capital_employed_ltm_history_{i}" for i in range(6)
-        ])
+        values, text_labels = [], []
+        for (_, cols, _), end in zip(PAST_HISTORY_GRAPHS, PAST_HISTORY_ENDS):
+            values.append(tuple(history_all[end - len(cols):end]))
+            text_labels.append(tuple(text_all[end - len(cols):end]))
 
-        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
-
-        # 12) Return on Capital Employed LTM History
-        create_history_chart("Return on Capital Employed (LTM) History", [
-            f"past_return_on_capital_employed_ltm_history_{i}" for i in range(6)
-        ])
+        st.plotly_chart(
+            build_past_history_grid(tuple(values), tuple(text_labels), PAST_HISTORY_LABELS, PAST_HISTORY_TITLES),
+            use_container_width=True
+        )
 
 # ---------------------------------------------------------
 # 📊 DIVIDEND → DIVIDEND COMPARISONS
@@ -2279,66 +2548,25 @@ with st.expander("Dividend"):
 
     with st.expander("Dividend Comparisons"):
 
-        # Colors (same as Value/Past Comparisons)
-        ICE_BLUE = "#7FDBFF"
-        GRAY = "#888888"
-        BLACK = "#000000"
-
-        # ------------------------------
-        # Helper bar chart function
-        # ------------------------------
-        def create_dividend_bar_chart(title, categories, values, colors):
-            fig = go.Figure()
-
-            for cat, val, colr in zip(categories, values, colors):
-
-                # Switch to white text for black bar
-                text_color = "white" if colr.lower() == "#000000" else "black"
-
-                fig.add_trace(go.Bar(
-                    x=[cat],
-                    y=[val],
-                    marker_color=colr,
-                    width=0.45,
-                    hoverinfo="skip",
-                    text=[f"{val:,.3f}" if pd.notna(val) else "N/A"],
-                    textposition="auto",
-                    textfont=dict(size=14, color=text_color)
-                ))
-
-            fig.update_layout(
-                title=dict(text=title, x=0.5, xanchor="center", font=dict(size=22, color="black")),
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False),
-                plot_bgcolor="white",
-                paper_bgcolor="white",
-                font_color="black",
-                showlegend=False,
-                height=350,
-                margin=dict(l=20, r=20, t=60, b=20)
-            )
-
-            return fig
-
         # -------------------------------------
         # Dividend Comparison — Single Graph
         # -------------------------------------
 
         categories = ["Company", "Industry Avg", "All Companies Avg"]
         values = [
-            snowflake_df.loc[snowflake_df["tickers"] == selected_ticker, "dividend"].iloc[0],
-            sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_dividends_score"].iloc[0],
-            sw_facts_df.loc[sw_facts_df["source_file"] == selected_ticker, "extended_data_industry_averages_all_dividends_score"].iloc[0]
+            snowflake_by_ticker[selected_ticker]["dividend"],
+            facts["extended_data_industry_averages_dividends_score"],
+            facts["extended_data_industry_averages_all_dividends_score"]
         ]
 
         colors = [ICE_BLUE, GRAY, BLACK]
 
         st.plotly_chart(
-            create_dividend_bar_chart(
+            build_dividend_bar_chart(
                 "Dividend Score Comparison",
-                categories,
-                values,
-                colors
+                tuple(categories),
+                tuple(values),
+                tuple(colors)
             ),
             use_container_width=True
         )
@@ -2359,136 +2587,45 @@ with st.expander("Dividend"):
 
         col_left_div, col_right_div = st.columns(2)
 
-        # -------------------------
-        # Get the most recent row for selected ticker
-        # -------------------------
-        sw_rows = sw_facts_df[sw_facts_df["source_file"] == selected_ticker]
-        if not sw_rows.empty:
-            sw = sw_rows.sort_values(by="date", ascending=False).iloc[0]  # Most recent row
-        else:
-            sw = None
-
-        # -------------------------
-        # Helper to extract values
-        # -------------------------
-        def get_div_stat(col):
-            try:
-                val = sw[col] if sw is not None else None
-                if val is None or pd.isna(val):
-                    return "N/A"
-                if isinstance(val, pd.Timestamp) or pd.api.types.is_datetime64_any_dtype(type(val)):
-                    return pd.to_datetime(val).strftime("%Y-%m-%d")
-                if isinstance(val, str):
-                    return val
-                if isinstance(val, (int, float)):
-                    return round(val, 3)
-                return str(val)
-            except:
-                return "N/A"
-
-        # -------------------------
-        # Columns to display
-        # -------------------------
-        dividend_stats_columns = [
-            "dividend_current",
-            "dividend_future",
-            "dividend_dividend_paying_years",
-            "dividend_payout_ratio",
-            "dividend_payout_ratio_3y",
-            "dividend_dividend_yield_growth_annual",
-            "dividend_first_payment",
-            "dividend_last_payment",
-            "dividend_buyback_yield",
-            "dividend_total_shareholder_yield",
-            "dividend_payout_ratio_median_3yr",
-            "dividend_dividend_payments_growth_annual",
-            "dividend_dividend_payments_ltm",
-            "dividend_cash_payout_ratio",
-            "dividend_dividend_currency_iso",
-
-            # value_intrinsic_value fields
-            "value_intrinsic_value_dividend_discount_dps",
-            "value_intrinsic_value_dividend_discount_roe",
-            "value_intrinsic_value_dividend_discount_payout",
-            "value_intrinsic_value_dividend_discount_ddm_growth",
-            "value_intrinsic_value_dividend_discount_npv_per_share",
-            "value_intrinsic_value_dividend_discount_expected_growth",
-
-            # upcoming dividend data (dates included)
-            "dividend_upcoming_dividend_date",
-            "dividend_upcoming_dividend_amount",
-            "dividend_upcoming_dividend_pay_date",
-            "dividend_upcoming_dividend_record_date",
-            "dividend_upcoming_dividend_adjustment_factor",
-            "dividend_upcoming_dividend_split_adjusted_amount",
-        ]
-
-        # -------------------------
-        # Clean Labels
-        # - Remove duplicate “Dividend”
-        # - Remove “value_intrinsic_value”
-        # - Convert underscores → spaces
-        # - Title-case the result
-        # -------------------------
-        cleaned_stats = {}
-        for col in dividend_stats_columns:
-            label = col.replace("value_intrinsic_value_", "")
-            label = label.replace("dividend_dividend", "dividend")
-            label = label.replace("_", " ").title()
-            cleaned_stats[label] = col
-
-        # -------------------------
-        # Alphabetize
-        # -------------------------
-        alphabetized = dict(sorted(cleaned_stats.items(), key=lambda x: x[0].lower()))
+        # Display values for every statistic, formatted by column dtype in one pass
+        div_stats = stat_display_values(facts_row, sw_facts_df.dtypes, DIVIDEND_STATS_COLS)
 
-        # Split evenly into left/right columns
-        items = list(alphabetized.items())
-        mid = len(items) // 2
-        left_items = items[:mid]
-        right_items = items[mid:]
+        # Split the precomputed, alphabetized labels evenly into left/right columns
+        mid = len(DIVIDEND_STATS_ITEMS) // 2
+        left_items = DIVIDEND_STATS_ITEMS[:mid]
+        right_items = DIVIDEND_STATS_ITEMS[mid:]
 
         # -------------------------
         # LEFT COLUMN
         # -------------------------
         with col_left_div:
-            for label, col in left_items:
-                st.markdown(
+            st.markdown(
+                "".join(
                     f"<div style='font-size:20px; margin-bottom:6px;'><b>{label}:</b> "
-                    f"<span style='font-size:24px; font-weight:bold;'>{get_div_stat(col)}</span></div>",
-                    unsafe_allow_html=True
-                )
+                    f"<span style='font-size:24px; font-weight:bold;'>{div_stats[col]}</span></div>"
+                    for label, col in left_items
+                ),
+                unsafe_allow_html=True
+            )
 
         # -------------------------
         # RIGHT COLUMN
         # -------------------------
         with col_right_div:
-            for label, col in right_items:
-                st.markdown(
+            st.markdown(
+                "".join(
                     f"<div style='font-size:20px; margin-bottom:6px;'><b>{label}:</b> "
-                    f"<span style='font-size:24px; font-weight:bold;'>{get_div_stat(col)}</span></div>",
-                    unsafe_allow_html=True
-                )
+                    f"<span style='font-size:24px; font-weight:bold;'>{div_stats[col]}</span></div>"
+                    for label, col in right_items
+                ),
+                unsafe_allow_html=True
+            )
 
     # ---------------------------------------------------------
     # 📊 DIVIDEND → DIVIDEND HISTORY EXPANDER
     # ---------------------------------------------------------
     with st.expander("Dividend History", expanded=False):
 
-        # Helper to safely extract numeric values
-        def get_hist_value(col):
-            try:
-                val = sw_facts_df.loc[
-                    sw_facts_df["source_file"] == selected_ticker, col
-                ].iloc[0]
-
-                if isinstance(val, (int, float)):
-                    return round(val, 3)
-
-                return None
-            except:
-                return None
-
         # -------------------------------------------------
         # FIRST GRAPH — Dividend Payments Single-Year Growth
         # -------------------------------------------------
@@ -2500,16 +2637,11 @@ with st.expander("Dividend"):
 
         labels = ["1Y", "3Y", "5Y"]
 
-        values = [get_hist_value(c) for c in columns]
-
-        # Filter only non-null values
-        df = pd.DataFrame({
-            "Period": [lbl for lbl, val in zip(labels, values) if val is not None],
-            "Value":  [val for val in values if val is not None]
-        })
-
-        # Ice blue only
-        ICE_BLUE = "#7FDBFF"
+        # Numeric values rounded in one pass; missing periods are dropped
+        values = pd.to_numeric(facts_row.reindex(columns), errors="coerce").round(3)
+        values.index = labels
+        values = values.dropna()
+        df = pd.DataFrame({"Period": values.index, "Value": values.to_numpy()})
 
         fig = go.Figure()
 
@@ -2546,93 +2678,13 @@ with st.expander("Management", expanded=False):
         
     with st.expander("Management Statistics", expanded=False):
 
-        # Columns provided (minus the one removed)
-        mgmt_columns = [
-            "health_management_rate_return",
-            "management_management_tenure",
-            "management_board_tenure",
-            "management_management_age",
-            "management_board_age",
-            "management_insider_buying_ratio",
-            "management_total_shares_bought",
-            "management_total_shares_sold",
-            "management_total_employees",
-            "management_ceo_salary_growth_1y",
-
-            # CEO compensation statement data
-            "extended_data_statements_management_ceoover_compensation_statement_data_ceo_name",
-            "extended_data_statements_management_ceoover_compensation_statement_data_market",
-            "extended_data_statements_management_ceoover_compensation_statement_data_median_compensation_usd",
-            "extended_data_statements_management_ceoover_compensation_statement_data_ceo_compensation_total_usd",
-            "extended_data_statements_management_ceosalary_growth_statement_data_earnings_per_share",
-        ]
-
-        # Column that must be removed entirely
-        # (you explicitly requested this)
-        remove_column = "extended_data_statements_management_ceoover_compensation_statement_data"
-        mgmt_columns = [c for c in mgmt_columns if c != remove_column]
-
-        # -------------------------------------------------
-        # Helper → get values safely
-        # -------------------------------------------------
-        def get_val(col):
-            try:
-                val = sw_facts_df.loc[
-                    sw_facts_df["source_file"] == selected_ticker,
-                    col
-                ].iloc[0]
-
-                # Text remains text
-                if isinstance(val, str):
-                    return val
-
-                return round(val, 3)
-            except:
-                return "N/A"
-
-        # -------------------------------------------------
-        # Clean + Format Display Names
-        # -------------------------------------------------
-        cleaned_items = {}
-
-        for col in mgmt_columns:
-            disp = col
-
-            # Remove health_
-            disp = disp.replace("health_", "")
-
-            # Remove duplicate "management"
-            disp = disp.replace("management_management_", "management_")
+        # Display values for every statistic, formatted by column dtype in one pass
+        mgmt_stats = stat_display_values(facts_row, sw_facts_df.dtypes, MGMT_STATS_COLS)
 
-            # Remove long prefixes
-            disp = disp.replace("extended_data_statements_management_", "")
-            disp = disp.replace("ceoover_compensation_statement_data_", "")
-            disp = disp.replace("ceosalary_growth_statement_data_", "")
-
-            # Remove leading prefix "management_" BEFORE title-case
-            # (but keep it if it's meaningful, do not remove suffix uses)
-            disp = disp.replace("management_", "management ")
-
-            # Replace underscores → spaces
-            disp = disp.replace("_", " ")
-
-            # Fix double spaces caused by replacements
-            while "  " in disp:
-                disp = disp.replace("  ", " ")
-
-            disp = disp.strip().title()
-
-            cleaned_items[disp] = col
-
-        # -------------------------------------------------
-        # Alphabetize
-        # -------------------------------------------------
-        sorted_items = dict(sorted(cleaned_items.items()))
-
-        # Split evenly into left and right columns
-        mid = len(sorted_items) // 2
-        left_items = list(sorted_items.items())[:mid]
-        right_items = list(sorted_items.items())[mid:]
+        # Split the precomputed, alphabetized labels evenly into left and right columns
+        mid = len(MGMT_STATS_ITEMS) // 2
+        left_items = MGMT_STATS_ITEMS[:mid]
+        right_items = MGMT_STATS_ITEMS[mid:]
 
         # -------------------------------------------------
         # Build Streamlit columns
@@ -2641,27 +2693,32 @@ with st.expander("Management", expanded=False):
 
         # LEFT COLUMN
         with col_left:
-            for label, col in left_items:
-                st.markdown(
+            st.markdown(
+                "".join(
                     f"<div style='font-size:20px;'>{label}:</div>"
-                    f"<div style='font-size:24px; font-weight:bold; margin-bottom:12px;'>{get_val(col)}</div>",
-                    unsafe_allow_html=True
-                )
+                    f"<div style='font-size:24px; font-weight:bold; margin-bottom:12px;'>{mgmt_stats[col]}</div>"
+                    for label, col in left_items
+                ),
+                unsafe_allow_html=True
+            )
 
         # RIGHT COLUMN
         with col_right:
-            for label, col in right_items:
-                st.markdown(
+            st.markdown(
+                "".join(
                     f"<div style='font-size:20px;'>{label}:</div>"
-                    f"<div style='font-size:24px; font-weight:bold; margin-bottom:12px;'>{get_val(col)}</div>",
-                    unsafe_allow_html=True
-                )
+                    f"<div style='font-size:24px; font-weight:bold; margin-bottom:12px;'>{mgmt_stats[col]}</div>"
+                    for label, col in right_items
+                ),
+                unsafe_allow_html=True
+            )
 
     with st.expander("Ownership Composition"):
 
-        # --- FILTER DATA FOR SELECTED TICKER ---
-        ownership_ticker_df = ownership_df[ownership_df["ticker"] == selected_ticker]
-        if ownership_ticker_df.empty:
+        # --- LATEST ROW FOR SELECTED TICKER ---
+        # ownership_by_ticker is keyed on the upper-cased "ticker" column
+        own = ownership_by_ticker.get(ticker_key)
+        if own is None:
             st.write("No ownership data available for this ticker.")
         else:
 
@@ -2685,7 +2742,6 @@ with st.expander("Management", expanded=False):
             }
 
             # --- CUSTOM COLORS ---
-            ICE_BLUE = "#7FDBFF"
             color_map = {
                 "Institutions": "#888888",       # gray
                 "Public Companies": "#ffb5b5",   # light red
@@ -2696,39 +2752,34 @@ with st.expander("Management", expanded=False):
             }
 
             # --- BUILD CHART DATA ---
-            ownership_data = []
-
-            for label, pct_col in percent_cols.items():
-                if pct_col in ownership_ticker_df.columns and share_cols[label] in ownership_ticker_df.columns:
-                    pct_value = ownership_ticker_df[pct_col].iloc[0]
-                    shares_value = ownership_ticker_df[share_cols[label]].iloc[0]
-                    if pd.notnull(pct_value):
-                        pct_value = round(float(pct_value), 2)  # round to nearest 100th
-                    ownership_data.append({
-                        "Category": label,
-                        "Percent": pct_value,
-                        "Shares": shares_value,
-                        "Color": color_map[label]
-                    })
+            # Categories whose percent and share columns both exist, read as two array slices
+            labels = [
+                label for label, pct_col in percent_cols.items()
+                if pct_col in own.index and share_cols[label] in own.index
+            ]
+            pct_values = pd.to_numeric(own[[percent_cols[l] for l in labels]], errors="coerce")
 
             # Sort descending by percent
-            ownership_df_plot = pd.DataFrame(ownership_data).sort_values("Percent", ascending=False)
+            ownership_df_plot = pd.DataFrame({
+                "Category": labels,
+                "Percent": pct_values.round(2).to_numpy(),  # round to nearest 100th
+                "Shares": own[[share_cols[l] for l in labels]].to_numpy(),
+                "Color": [color_map[l] for l in labels],
+            }).sort_values("Percent", ascending=False)
 
             # --- PLOT ---
-            import plotly.graph_objects as go
-
+            # One trace carrying every category, with per-bar colors and share counts
             fig = go.Figure()
-
-            for i, row in ownership_df_plot.iterrows():
-                fig.add_trace(go.Bar(
-                    x=[row["Category"]],
-                    y=[row["Percent"]],
-                    marker_color=row["Color"],
-                    hovertemplate=f"<b>Shares:</b> {row['Shares']}<extra></extra>",
-                    text=f"{row['Percent']}%",
-                    textposition="auto",
-                    textfont=dict(size=14, family="Arial", color="black")
-                ))
+            fig.add_trace(go.Bar(
+                x=ownership_df_plot["Category"].tolist(),
+                y=ownership_df_plot["Percent"].tolist(),
+                marker_color=ownership_df_plot["Color"].tolist(),
+                customdata=ownership_df_plot["Shares"].tolist(),
+                hovertemplate="<b>Shares:</b> %{customdata}<extra></extra>",
+                text=[f"{p}%" for p in ownership_df_plot["Percent"]],
+                textposition="auto",
+                textfont=dict(size=14, family="Arial", color="black")
+            ))
 
             fig.update_layout(
                 title=dict(text="Ownership Composition", x=0.5, xanchor="center", font=dict(size=24)),
@@ -2744,63 +2795,21 @@ with st.expander("Management", expanded=False):
     # ---------------- Company Holders Expander ----------------
     with st.expander("Company Holders", expanded=False):
 
-        # Load Data
-        df = sql["company_info"].copy()
-
-        # Ensure columns are strings & lowercase
-        df.columns = df.columns.astype(str).str.lower()
+        # Shared frame: load_table already stripped/upper-cased ticker and parsed holding_date
+        df = sql["company_info"]
 
         if "ticker" in df.columns and "holding_date" in df.columns:
-            # Strip spaces and uppercase for safety
-            df["ticker"] = df["ticker"].astype(str).str.strip().str.upper()
-            ticker_to_use = selected_ticker.strip().upper()
-
             # Filter for selected ticker first
-            filtered_df = df.loc[df["ticker"] == ticker_to_use].copy()
+            filtered_df = ticker_rows(df, ticker_key)
 
             if not filtered_df.empty:
-                # Sort by holding_date descending to get most recent values
-                filtered_df["holding_date"] = pd.to_datetime(filtered_df["holding_date"], errors="coerce")
-                filtered_df = filtered_df.sort_values("holding_date", ascending=False).head(100)
-
-                # Columns to display
-                display_columns = {
-                    "owner_name": "Owner Name",
-                    "owner_type": "Owner Type",
-                    "shares_held": "Shares Held",
-                    "percent_shares_outstanding": "Percent Shares Outstanding",
-                    "percent_of_portfolio": "Percent of Portfolio",
-                    "holding_date": "Holding Date"
-                }
-
-                # Keep only existing columns
-                filtered_columns = [col for col in display_columns.keys() if col in filtered_df.columns]
-                display_df = filtered_df[filtered_columns].rename(
-                    columns={col: display_columns[col] for col in filtered_columns}
-                )
+                # 100 most recent holdings, newest first
+                filtered_df = filtered_df.nlargest(100, "holding_date")
 
-                # Apply styling: bold headers and hover highlight
-                st.markdown(
-                    """
-                    <style>
-                    th {
-                        font-size: 16px;
-                        font-weight: bold;
-                        text-align: left;
-                    }
-                    td {
-                        font-size: 14px;
-                    }
-                    tbody tr:hover {
-                        background-color: #f0f8ff;
-                    }
-                    </style>
-                    """,
-                    unsafe_allow_html=True
-                )
+                display_df = filtered_df[HOLDER_DISPLAY_COLS].rename(columns=HOLDER_DISPLAY_NAMES)
 
-                # Display interactive dataframe
-                st.dataframe(display_df, use_container_width=True, height=500)
+                # Display interactive dataframe (the ticker index is not shipped)
+                st.dataframe(display_df, hide_index=True, use_container_width=True, height=500)
 
             else:
                 st.write("No holder data available for this ticker.")
@@ -2810,64 +2819,21 @@ with st.expander("Management", expanded=False):
     # ---------------- Insider Trading Expander ----------------
     with st.expander("Insider Trading", expanded=False):
 
-        # Load Data
-        df = sql["insider_transactions"].copy()
-
-        # Ensure columns are strings & lowercase
-        df.columns = df.columns.astype(str).str.lower()
+        # Shared frame: load_table already stripped/upper-cased ticker and parsed filing_date
+        df = sql["insider_transactions"]
 
         if "ticker" in df.columns and "filing_date" in df.columns:
-            # Strip spaces and uppercase for safety
-            df["ticker"] = df["ticker"].astype(str).str.strip().str.upper()
-            ticker_to_use = selected_ticker.strip().upper()
-
             # Filter for selected ticker first
-            filtered_df = df.loc[df["ticker"] == ticker_to_use].copy()
+            filtered_df = ticker_rows(df, ticker_key)
 
             if not filtered_df.empty:
-                # Sort by holding_date descending to get most recent values
-                filtered_df["filing_date"] = pd.to_datetime(filtered_df["filing_date"], errors="coerce")
-                filtered_df = filtered_df.sort_values("filing_date", ascending=False).head(100)
-
-                # Columns to display
-                display_columns = {
-                    "filing_date": "Filing Date",
-                    "owner_name": "Owner Name",
-                    "owner_type": "Owner Type",
-                    "transaction_type": "Transaction Type",
-                    "shares": "Shares",
-                    "price_max": "Price Max",
-                    "transaction_value": "Transaction Value",
-                }
-
-                # Keep only existing columns
-                filtered_columns = [col for col in display_columns.keys() if col in filtered_df.columns]
-                display_df = filtered_df[filtered_columns].rename(
-                    columns={col: display_columns[col] for col in filtered_columns}
-                )
+                # 100 most recent filings, newest first
+                filtered_df = filtered_df.nlargest(100, "filing_date")
 
-                # Apply styling: bold headers and hover highlight
-                st.markdown(
-                    """
-                    <style>
-                    th {
-                        font-size: 16px;
-                        font-weight: bold;
-                        text-align: left;
-                    }
-                    td {
-                        font-size: 14px;
-                    }
-                    tbody tr:hover {
-                        background-color: #f0f8ff;
-                    }
-                    </style>
-                    """,
-                    unsafe_allow_html=True
-                )
+                display_df = filtered_df[INSIDER_DISPLAY_COLS].rename(columns=INSIDER_DISPLAY_NAMES)
 
-                # Display interactive dataframe
-                st.dataframe(display_df, use_container_width=True, height=500)
+                # Display interactive dataframe (the ticker index is not shipped)
+                st.dataframe(display_df, hide_index=True, use_container_width=True, height=500)
 
             else:
                 st.write("No insider trading data available for this ticker.")
@@ -2878,55 +2844,19 @@ st.markdown("---")
 # NORMALIZE TICKERS (RUN ONCE)
 # =========================================================
 
-def normalize_ticker(series):
-    return series.astype(str).str.upper().str.strip()
-
-# Simply Wall St
-if not sw_facts_df.empty:
-    sw_facts_df = sw_facts_df.copy()
-    sw_facts_df["ticker"] = normalize_ticker(sw_facts_df["source_file"])
-    sw_facts_df["date"] = pd.to_datetime(sw_facts_df["date"], errors="coerce")
-
-# Stock prices
-if not stock_df.empty:
-    stock_df = stock_df.copy()
-    stock_df["ticker"] = normalize_ticker(stock_df["tickers"])
-    stock_df["trade_date"] = pd.to_datetime(stock_df["trade_date"], errors="coerce")
-
-# Insider transactions
-insider_df = sql["insider_transactions"].copy()
-if not insider_df.empty:
-    insider_df.columns = insider_df.columns.str.lower()
-    insider_df["ticker"] = normalize_ticker(insider_df["ticker"])
-    insider_df["filing_date"] = pd.to_datetime(insider_df["filing_date"], errors="coerce")
-
-# Company info / holders
-company_info_df = sql["company_info"].copy()
-if not company_info_df.empty:
-    company_info_df.columns = company_info_df.columns.str.lower()
-    company_info_df["ticker"] = normalize_ticker(company_info_df["ticker"])
-    company_info_df["holding_date"] = pd.to_datetime(company_info_df["holding_date"], errors="coerce")
-
-# Ownership
-ownership_df = sql["ownership_breakdown"].copy()
-if not ownership_df.empty:
-    ownership_df["ticker"] = normalize_ticker(ownership_df["ticker"])
-    ownership_df["html_creation_date"] = pd.to_datetime(
-        ownership_df["html_creation_date"], errors="coerce"
-    )
-
-# =========================================================
-# Extract selected ticker and company name (once)
-# =========================================================
-# selected_option format example: "AAPL - Apple Inc."
-selected_ticker, selected_company = selected_option.split(" - ")
-selected_ticker = selected_ticker.strip().upper()
-selected_company = selected_company.strip()
+# Every frame arrives normalized from its cached loader: load_table for the shared
+# tables, load_stock_for_ticker for prices (ticker key + parsed trade_date).
+# Nothing is recomputed here on reruns; these are plain aliases.
+stock_df = price_data
+insider_df = sql["insider_transactions"]
+company_info_df = sql["company_info"]
 
 # =========================================================
-# SELECTED TICKER
+# Extract selected company name (once)
 # =========================================================
-selected_ticker = selected_option.split(" - ")[0].strip().upper()
+# selected_option format example: "AAPL - Apple Inc."; the ticker itself is parsed
+# once at the top (selected_ticker raw, ticker_key upper-cased) and not rebound here
+selected_company = selected_option.split(" - ")[1].strip()
 
 # =========================================================
 # STOCK TECHNICALS (MOST RECENT)
@@ -2946,15 +2876,14 @@ metric_map = {
 }
 
 def build_stock_snapshot(df, ticker):
-    df = df[df["ticker"] == ticker]
-    if df.empty:
+    # df is one ticker's history sorted by trade_date, so the latest row is the last one
+    if df.empty or df["ticker"].iat[-1] != ticker:
         return "### 📊 Stock Metrics\nNo data available."
 
-    row = df.loc[df["trade_date"].idxmax()]
+    vals = pd.to_numeric(df.iloc[-1].reindex(list(metric_map)), errors="coerce")
+    text = vals.map("{:,.4f}".format).where(vals.notna(), "N/A")
     lines = ["### 📊 Stock Metrics (Most Recent)"]
-    for col, label in metric_map.items():
-        val = row.get(col)
-        lines.append(f"{label}: {val:,.4f}" if pd.notna(val) else f"{label}: N/A")
+    lines.extend(f"{label}: {t}" for label, t in zip(metric_map.values(), text))
     return "\n".join(lines)
 
 # =========================================================
@@ -3354,25 +3283,21 @@ valuation_stats_map = {
     "Price Target High": "value_price_target_high"
 }
 
-def build_sw_snapshot(df, ticker):
-    df = df[df["ticker"] == ticker]
-    if df.empty:
+def build_sw_snapshot(row):
+    # row is the ticker's latest facts row (load_table keeps only the newest per ticker), or None
+    if row is None:
         return "\n--- Simply Wall St Valuation ---\nNo data available."
 
-    row = df.loc[df["date"].idxmax()]
     lines = ["\n--- Simply Wall St Valuation ---"]
 
     for label, col in valuation_stats_map.items():
         val = row.get(col)
         # Safe numeric formatting
         if pd.notna(val):
-            try:
-                # Only format if it's int or float
-                if isinstance(val, (int, float)):
-                    lines.append(f"{label}: {val:,.4f}")
-                else:
-                    lines.append(f"{label}: {val}")
-            except:
+            # Only format if it's numeric (incl. numpy float32/int scalars)
+            if pd.api.types.is_number(val):
+                lines.append(f"{label}: {val:,.4f}")
+            else:
                 lines.append(f"{label}: {val}")
         else:
             lines.append(f"{label}: N/A")
@@ -3382,12 +3307,10 @@ def build_sw_snapshot(df, ticker):
 # =========================================================
 # OWNERSHIP COMPOSITION
 # =========================================================
-def build_ownership_snapshot(df, ticker):
-    df = df[df["ticker"] == ticker]
-    if df.empty:
+def build_ownership_snapshot(row):
+    if row is None:
         return "\n--- Ownership Composition ---\nNo data available."
 
-    row = df.loc[df["html_creation_date"].idxmax()]
     return f"""
 --- Ownership Composition (Most Recent) ---
 Institutions: {row.get('institutions_percent','N/A')}
@@ -3399,43 +3322,36 @@ General Public: {row.get('general_public_percent','N/A')}
 # COMPANY HOLDERS
 # =========================================================
 def build_company_holders_snapshot(df, ticker, n=5):
-    df = df[df["ticker"] == ticker].sort_values(
-        "holding_date", ascending=False
-    ).head(n)
+    df = ticker_rows(df, ticker).nlargest(n, "holding_date")
     if df.empty:
         return "\n--- Company Holders ---\nNo data available."
 
     lines = ["\n--- Company Holders (Most Recent 5) ---"]
-    for _, r in df.iterrows():
-        lines.append(
-            f"{r['holding_date'].date()} | {r.get('owner_name','N/A')} | Shares: {r.get('shares_held','N/A')}"
-        )
+    rows = df[["holding_date", "owner_name", "shares_held"]].itertuples(index=False, name=None)
+    for holding_date, owner_name, shares_held in rows:
+        lines.append(f"{holding_date.date()} | {owner_name} | Shares: {shares_held}")
     return "\n".join(lines)
 
 # =========================================================
 # INSIDER TRANSACTIONS
 # =========================================================
 def build_insider_snapshot(df, ticker, n=5):
-    df = df[df["ticker"] == ticker].sort_values(
-        "filing_date", ascending=False
-    ).head(n)
+    df = ticker_rows(df, ticker).nlargest(n, "filing_date")
     if df.empty:
         return "\n--- Insider Transactions ---\nNo data available."
 
     lines = ["\n--- Insider Transactions (Most Recent 5) ---"]
-    for _, r in df.iterrows():
-        lines.append(
-            f"{r['filing_date'].date()} | {r.get('transaction_type','N/A')} | Shares: {r.get('shares','N/A')}"
-        )
+    rows = df[["filing_date", "transaction_type", "shares"]].itertuples(index=False, name=None)
+    for filing_date, transaction_type, shares in rows:
+        lines.append(f"{filing_date.date()} | {transaction_type} | Shares: {shares}")
     return "\n".join(lines)
 
 # =========================================================
 # FEAR & GREED (MARKET)
 # =========================================================
 if not fear_greed_df.empty:
-    fg = fear_greed_df.copy()
-    fg["date"] = pd.to_datetime(fg["date"], errors="coerce")
-    fg_row = fg.loc[fg["date"].idxmax()]
+    # date is parsed in load_table
+    fg_row = fear_greed_df.loc[fear_greed_df["date"].idxmax()]
     fg_text = f"\n### 📈 Fear & Greed Index: {fg_row.get('fear_and_greed','N/A')}"
 else:
     fg_text = "\n### 📈 Fear & Greed Index: N/A"
@@ -3459,17 +3375,18 @@ ANALYSIS INSTRUCTIONS
 • Provide a professional, conservative, institutional analyst opinion that offers a 1, 6, 12 month forecast in bull, neutral and bear circumstances and what those circumstances might be
 • What price range is a good entry point? Factor in dividend payments.
 • Talk about current news regarding the stock that could contribute in a good or bad way.
-Stock analyzed: {selected_ticker} — {selected_company}
+Stock analyzed: {ticker_key} — {selected_company}
 """
 
     # Combine all sections
     snapshot_parts = [
-        build_stock_snapshot(stock_df, selected_ticker),
+        build_stock_snapshot(stock_df, ticker_key),
         fg_text,
-        build_sw_snapshot(sw_facts_df, selected_ticker),
-        build_ownership_snapshot(ownership_df, selected_ticker),
-        build_company_holders_snapshot(company_info_df, selected_ticker),
-        build_insider_snapshot(insider_df, selected_ticker),
+        # sw_by_ticker is keyed on the raw source_file, like every other facts lookup
+        build_sw_snapshot(sw_by_ticker.get(selected_ticker)),
+        build_ownership_snapshot(ownership_by_ticker.get(ticker_key)),
+        build_company_holders_snapshot(company_info_df, ticker_key),
+        build_insider_snapshot(insider_df, ticker_key),
         analysis_instructions  # append at the end
     ]
     return "\n".join(snapshot_parts)